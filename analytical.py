@@ -0,0 +1,702 @@
+# analytical.py
+#
+# Closed-form queueing estimates of per-class delay and loss.
+# Used as an instant preview (GUI) and to prune sweep grids
+# before running the packet-level simulation.
+
+import math
+
+from scheduler import LINK_BANDWIDTH, PFScheduler
+from traffic_classes import DEFAULT_CLASSES, get_registry
+
+
+DEFAULT_BUFFER_SIZES = {
+    "Priority": 50,
+    "WFQ": 150,
+    "PF": 150
+}
+
+
+# ==========================================================
+# TRAFFIC MODEL
+# ==========================================================
+
+def class_profiles(arrival_rate, registry):
+    """
+    Per-class arrival rate (pkt/s), mean size (bits),
+    E[S], E[S^2] (service time moments, sec) and deadline,
+    keyed by class name in priority (class_id) order.
+    """
+
+    profiles = {}
+
+    for class_id, traffic_type in enumerate(registry.names):
+
+        low, high = registry.size_ranges[class_id]
+
+        # Discrete uniform on [low, high] bytes, scaled to bits
+        mean_bytes = (low + high) / 2
+        var_bytes = ((high - low + 1) ** 2 - 1) / 12
+
+        mean_bits = mean_bytes * 8
+        second_moment_bits = (var_bytes + mean_bytes ** 2) * 64
+
+        profiles[traffic_type] = {
+            "rate": arrival_rate * registry.shares[class_id],
+            "mean_size": mean_bits,
+            "service": mean_bits / LINK_BANDWIDTH,
+            "service_sq": second_moment_bits / LINK_BANDWIDTH ** 2,
+            "deadline": registry.deadlines[class_id]
+        }
+
+    return profiles
+
+
+def _deadline_split(busy, mean_wait, deadline):
+    """
+    Waiting time modelled as P(W > t) = busy * exp(-busy t / E[W]).
+    Returns (mean wait of packets meeting the deadline, late fraction).
+    """
+
+    if mean_wait <= 0 or busy <= 0:
+        return 0.0, 0.0
+
+    scale = mean_wait / busy
+
+    tail = math.exp(-deadline / scale) if deadline > 0 else 1.0
+
+    # No usable deadline budget: every packet that waits is late
+    if tail >= 1:
+        return 0.0, busy
+
+    late = busy * tail
+
+    # Mean of the exponential part truncated at the deadline
+    truncated = scale - deadline * tail / (1 - tail)
+
+    return busy * truncated / (1 - late), late
+
+
+def _overload_wait(profile, buffer_size, residual_rate):
+
+    # A saturated class sits on a full buffer drained at its
+    # residual rate, but nothing waits longer than its deadline.
+    if residual_rate <= 0:
+        return profile["deadline"]
+
+    drain = buffer_size * profile["mean_size"] / residual_rate
+
+    return min(drain, profile["deadline"])
+
+
+def _results(profiles, served, waits, late):
+
+    results = {}
+
+    total_bits = 0
+
+    for traffic_type, profile in profiles.items():
+
+        offered = profile["rate"] * profile["mean_size"]
+
+        carried = served[traffic_type] * (1 - late[traffic_type])
+
+        loss_ratio = 1 - carried / offered if offered > 0 else 0
+
+        results[traffic_type] = {
+            "average_delay": waits[traffic_type] + profile["service"],
+            "loss_ratio": max(0.0, min(1.0, loss_ratio))
+        }
+
+        total_bits += carried
+
+    results["overall_throughput"] = total_bits
+
+    return results
+
+
+# ==========================================================
+# PRIORITY: NON-PREEMPTIVE M/G/1 WITH PRIORITY CLASSES
+# ==========================================================
+
+def _priority_model(profiles, order, buffer_size):
+    """
+    Non-preemptive M/G/1 with classes served strictly in `order`.
+    Returns (served bits/s, mean wait, late fraction) per class.
+    """
+
+    served = {}
+    waits = {}
+    late = {}
+
+    # Strict priority hands out capacity class by class
+    capacity_left = LINK_BANDWIDTH
+
+    for traffic_type in order:
+
+        profile = profiles[traffic_type]
+        offered = profile["rate"] * profile["mean_size"]
+
+        served[traffic_type] = min(offered, capacity_left)
+        capacity_left = max(0.0, capacity_left - offered)
+
+    # Only carried packets occupy the link, so the mean residual
+    # service seen by an arrival (Cobham's W0) uses carried rates.
+    carried_rate = {
+        key: served[key] / p["mean_size"] for key, p in profiles.items()
+    }
+
+    busy = min(1.0, sum(served.values()) / LINK_BANDWIDTH)
+
+    residual = sum(
+        carried_rate[key] * p["service_sq"] / 2
+        for key, p in profiles.items()
+    )
+
+    sigma = 0.0
+    capacity_left = LINK_BANDWIDTH
+
+    for traffic_type in order:
+
+        profile = profiles[traffic_type]
+
+        load = carried_rate[traffic_type] * profile["service"]
+        offered = profile["rate"] * profile["mean_size"]
+
+        if offered <= capacity_left and sigma + load < 1:
+            wait = residual / ((1 - sigma) * (1 - sigma - load))
+            waits[traffic_type], late[traffic_type] = _deadline_split(
+                busy, wait, profile["deadline"]
+            )
+        else:
+            waits[traffic_type] = _overload_wait(
+                profile, buffer_size, capacity_left
+            )
+            late[traffic_type] = 0.0
+
+        capacity_left = max(0.0, capacity_left - offered)
+        sigma = min(1.0, sigma + load)
+
+    return served, waits, late
+
+
+def estimate_priority(arrival_rate, buffer_size=None, registry=None):
+
+    if buffer_size is None:
+        buffer_size = DEFAULT_BUFFER_SIZES["Priority"]
+
+    profiles = class_profiles(arrival_rate, registry or get_registry())
+
+    return _results(
+        profiles, *_priority_model(profiles, list(profiles), buffer_size)
+    )
+
+
+# ==========================================================
+# GPS FLUID ALLOCATION AND ISOLATION BOUND
+# ==========================================================
+
+def gps_allocation(demands, weights, capacity):
+    """
+    Max-min weighted fair (water-filling) split of capacity.
+    """
+
+    allocation = {key: 0.0 for key in demands}
+    active = {key for key, demand in demands.items() if demand > 0}
+
+    remaining = capacity
+
+    while active and remaining > 1e-9:
+
+        total_weight = sum(weights[key] for key in active)
+
+        satisfied = {
+            key for key in active
+            if demands[key] - allocation[key] <=
+            remaining * weights[key] / total_weight
+        }
+
+        if not satisfied:
+            for key in active:
+                allocation[key] += remaining * weights[key] / total_weight
+            break
+
+        for key in satisfied:
+            remaining -= demands[key] - allocation[key]
+            allocation[key] = demands[key]
+
+        active -= satisfied
+
+    return allocation
+
+
+def estimate_gps(arrival_rate, weights, buffer_size, registry):
+
+    profiles = class_profiles(arrival_rate, registry)
+
+    demands = {
+        key: p["rate"] * p["mean_size"] for key, p in profiles.items()
+    }
+
+    served = gps_allocation(demands, weights, LINK_BANDWIDTH)
+
+    total_weight = sum(weights.values())
+    total_served = sum(served.values())
+
+    busy = min(1.0, total_served / LINK_BANDWIDTH)
+
+    # Packetised WFQ lags GPS by at most one maximum-size packet
+    max_packet = max(high for _, high in registry.size_ranges) * 8
+    packet_lag = max_packet / LINK_BANDWIDTH
+
+    waits = {}
+    late = {}
+
+    for traffic_type, profile in profiles.items():
+
+        # Service rate while backlogged: the GPS share this class
+        # would get with unbounded demand against the others.
+        backlogged = dict(demands, **{traffic_type: LINK_BANDWIDTH})
+        rate = gps_allocation(backlogged, weights, LINK_BANDWIDTH)[traffic_type]
+
+        load = demands[traffic_type] / rate
+
+        if load < 1:
+            # M/G/1 on the capacity left to this class, plus the
+            # GPS-to-WFQ packet lag seen behind other classes.
+            scale = LINK_BANDWIDTH / rate
+            wait = (
+                profile["rate"] * profile["service_sq"] * scale ** 2 /
+                (2 * (1 - load))
+            ) + packet_lag * (1 - rate / LINK_BANDWIDTH)
+            waits[traffic_type], late[traffic_type] = _deadline_split(
+                busy, wait, profile["deadline"]
+            )
+        else:
+            waits[traffic_type] = _overload_wait(
+                profile,
+                buffer_size * weights[traffic_type] / total_weight,
+                served[traffic_type]
+            )
+            late[traffic_type] = 0.0
+
+    return _results(profiles, served, waits, late)
+
+
+def estimate_wfq(arrival_rate, buffer_size=None, registry=None):
+
+    # WFQScheduler tags packets in bits / weight while its virtual
+    # clock advances in seconds, so tags are driven by each class's
+    # own backlog: the class whose tags grow slowest (offered bits
+    # per second / weight) is always ahead. Measured against the
+    # simulator this behaves as strict priority in that order, so
+    # it is modelled that way rather than as GPS.
+    if buffer_size is None:
+        buffer_size = DEFAULT_BUFFER_SIZES["WFQ"]
+
+    registry = registry or get_registry()
+
+    profiles = class_profiles(arrival_rate, registry)
+
+    weights = dict(zip(registry.names, registry.weights))
+
+    order = sorted(
+        profiles,
+        key=lambda key: profiles[key]["rate"] *
+        profiles[key]["mean_size"] / weights[key]
+    )
+
+    return _results(profiles, *_priority_model(profiles, order, buffer_size))
+
+
+def _pf_saturation_sends():
+
+    # PFScheduler starts every class at 1e-6 and moves it toward
+    # LINK_BANDWIDTH on each send; count sends until it stops moving.
+    average = 1e-6
+
+    for sends in range(10000):
+
+        updated = PFScheduler.ALPHA * average + \
+            (1 - PFScheduler.ALPHA) * LINK_BANDWIDTH
+
+        if updated == average:
+            return sends
+
+        average = updated
+
+    return sends
+
+
+PF_SATURATION_SENDS = _pf_saturation_sends()
+
+
+def _blend(first, second, share):
+
+    # `share` of the run behaves like `first`, the rest like `second`
+    results = {
+        "overall_throughput":
+            share * first["overall_throughput"] +
+            (1 - share) * second["overall_throughput"]
+    }
+
+    for traffic_type, a in first.items():
+
+        if traffic_type == "overall_throughput":
+            continue
+
+        b = second[traffic_type]
+
+        # Delay is averaged over delivered packets
+        delivered_a = share * (1 - a["loss_ratio"])
+        delivered_b = (1 - share) * (1 - b["loss_ratio"])
+        delivered = delivered_a + delivered_b
+
+        results[traffic_type] = {
+            "average_delay": (
+                delivered_a * a["average_delay"] +
+                delivered_b * b["average_delay"]
+            ) / delivered if delivered > 0 else a["average_delay"],
+            "loss_ratio":
+                share * a["loss_ratio"] + (1 - share) * b["loss_ratio"]
+        }
+
+    return results
+
+
+def estimate_pf(arrival_rate, buffer_size=None, registry=None,
+                simulation_time=None):
+
+    # PFScheduler's achieved rate is always LINK_BANDWIDTH, so each
+    # class's average throughput only counts its sends and stops
+    # changing after PF_SATURATION_SENDS of them. Until then PF
+    # serves the backlogged class with the fewest sends: equal
+    # packet shares, i.e. GPS weighted by mean packet size. Once
+    # every class is saturated the metrics tie and the lowest
+    # class id wins, i.e. strict priority. Without overload both
+    # phases serve everything, so only overload needs the split.
+    # simulation_time=None gives the long-run estimate.
+    if buffer_size is None:
+        buffer_size = DEFAULT_BUFFER_SIZES["PF"]
+
+    registry = registry or get_registry()
+
+    profiles = class_profiles(arrival_rate, registry)
+
+    steady = _results(
+        profiles, *_priority_model(profiles, list(profiles), buffer_size)
+    )
+
+    offered = sum(p["rate"] * p["mean_size"] for p in profiles.values())
+
+    if simulation_time is None or offered <= LINK_BANDWIDTH:
+        return steady
+
+    weights = {key: p["mean_size"] for key, p in profiles.items()}
+
+    equal = estimate_gps(arrival_rate, weights, buffer_size, registry)
+
+    # The equal-share phase lasts until the slowest class saturates
+    send_rates = [
+        p["rate"] * (1 - equal[key]["loss_ratio"])
+        for key, p in profiles.items() if p["rate"] > 0
+    ]
+
+    slowest = min(send_rates, default=0.0)
+
+    if slowest <= 0:
+        return equal
+
+    share = min(1.0, PF_SATURATION_SENDS / slowest / simulation_time)
+
+    return _blend(equal, steady, share)
+
+
+ESTIMATORS = {
+    "Priority": estimate_priority,
+    "WFQ": estimate_wfq,
+    "PF": estimate_pf
+}
+
+
+def estimate(scheduler_type, arrival_rate, buffer_size=None, registry=None,
+             simulation_time=None):
+    """
+    simulation_time: length of the run being previewed; only PF
+    depends on it (None: long-run estimate).
+    """
+
+    if scheduler_type not in ESTIMATORS:
+        raise ValueError(f"Unknown scheduler type: {scheduler_type}")
+
+    if scheduler_type == "PF":
+        return estimate_pf(arrival_rate, buffer_size, registry, simulation_time)
+
+    return ESTIMATORS[scheduler_type](arrival_rate, buffer_size, registry)
+
+
+# ==========================================================
+# ERROR BOUNDS
+# ==========================================================
+
+# Validated region: the default registry, 10-200 pkt/s, the default
+# buffer of each scheduler and 20-100 s runs. (Blocking in the shared
+# WFQ/PF buffer is not modelled; smaller buffers block voice far more
+# often than these bounds allow.) ERROR_BOUNDS hold the largest
+# |estimate - simulation| per scheduler and class on the calibration
+# seeds, times 1.5 plus a floor (`python analytical.py --calibrate`).
+# `python analytical.py` checks them on held-out seeds. Delay errors
+# only count classes that deliver at least 10% of their packets;
+# the mean delay of a starved class is noise.
+VALIDATED_RATES = (10, 200)
+VALIDATED_TIMES = (20, 100)
+
+CALIBRATION_SEEDS = range(3)
+HOLDOUT_SEEDS = range(100, 105)
+
+BOUND_MARGIN = 1.5
+BOUND_FLOOR = {"average_delay": 0.002, "loss_ratio": 0.01}
+
+MAX_DELAY_LOSS = 0.9
+
+ERROR_BOUNDS = {
+    "Priority": {
+        "voice": {"average_delay": 0.005, "loss_ratio": 0.073},
+        "video": {"average_delay": 0.075, "loss_ratio": 0.094},
+        "data": {"average_delay": 0.158, "loss_ratio": 0.079}
+    },
+    "WFQ": {
+        "voice": {"average_delay": 0.006, "loss_ratio": 0.173},
+        "video": {"average_delay": 0.076, "loss_ratio": 0.106},
+        "data": {"average_delay": 0.158, "loss_ratio": 0.079}
+    },
+    "PF": {
+        "voice": {"average_delay": 0.041, "loss_ratio": 0.119},
+        "video": {"average_delay": 0.085, "loss_ratio": 0.141},
+        "data": {"average_delay": 0.174, "loss_ratio": 0.089}
+    }
+}
+
+
+def error_bounds(scheduler_type, arrival_rate, buffer_size=None,
+                 simulation_time=None):
+    """
+    {class name: {"average_delay": bound, "loss_ratio": bound}} for
+    this point, or None if it lies outside the validated region.
+    """
+
+    if buffer_size is None:
+        buffer_size = DEFAULT_BUFFER_SIZES[scheduler_type]
+
+    validated = (
+        get_registry() is DEFAULT_CLASSES and
+        simulation_time is not None and
+        VALIDATED_RATES[0] <= arrival_rate <= VALIDATED_RATES[1] and
+        buffer_size == DEFAULT_BUFFER_SIZES[scheduler_type] and
+        VALIDATED_TIMES[0] <= simulation_time <= VALIDATED_TIMES[1]
+    )
+
+    return ERROR_BOUNDS[scheduler_type] if validated else None
+
+
+# ==========================================================
+# SWEEP PRE-FILTER
+# ==========================================================
+
+def prune_sweep(grid, limits, simulation_time):
+    """
+    grid: iterable of (scheduler_type, arrival_rate, buffer_size)
+    limits: {class name: {"average_delay": max, "loss_ratio": max}}
+    simulation_time: length of the runs the sweep will do
+
+    Returns the grid points worth simulating. A point is dropped
+    only if an estimate misses a limit by more than its error
+    bound. Points outside the validated region are always kept.
+    """
+
+    kept = []
+
+    for point in grid:
+
+        bounds = error_bounds(*point, simulation_time)
+
+        if bounds is None or not _misses_limits(
+                estimate(*point, simulation_time=simulation_time),
+                limits, bounds):
+            kept.append(point)
+
+    return kept
+
+
+def _misses_limits(predicted, limits, bounds):
+
+    for traffic_type, class_limits in limits.items():
+
+        stats = predicted[traffic_type]
+        bound = bounds[traffic_type]
+
+        if "loss_ratio" in class_limits and stats["loss_ratio"] > \
+                class_limits["loss_ratio"] + bound["loss_ratio"]:
+            return True
+
+        # Delay bounds only hold where the class is not starved
+        if "average_delay" in class_limits and \
+                stats["loss_ratio"] + bound["loss_ratio"] <= MAX_DELAY_LOSS \
+                and stats["average_delay"] > \
+                class_limits["average_delay"] + bound["average_delay"]:
+            return True
+
+    return False
+
+
+# ==========================================================
+# VALIDATION AGAINST SIMULATION
+# ==========================================================
+
+def validate(seeds, rates=(10, 20, 30, 60, 120, 200),
+             simulation_times=(20, 100), verbose=False):
+    """
+    Compare estimates with seed-averaged simulations of the
+    default schedulers over the validated region. Returns the
+    worst absolute errors in the same shape as ERROR_BOUNDS.
+    """
+
+    import random
+
+    from metrics import calculate_metrics
+    from scheduler import PriorityScheduler, WFQScheduler
+    from traffic_generator import generate_traffic
+
+    schedulers = {
+        "Priority": PriorityScheduler,
+        "WFQ": WFQScheduler,
+        "PF": PFScheduler
+    }
+
+    names = get_registry().names
+    keys = ("average_delay", "loss_ratio")
+
+    worst = {
+        name: {t: {key: 0.0 for key in keys} for t in names}
+        for name in schedulers
+    }
+
+    for simulation_time in simulation_times:
+        for arrival_rate in rates:
+
+            traces = []
+
+            for seed in seeds:
+                random.seed(seed)
+                traces.append(generate_traffic(simulation_time, arrival_rate))
+
+            for name, scheduler_class in schedulers.items():
+
+                buffer_size = DEFAULT_BUFFER_SIZES[name]
+
+                simulated = {t: {key: 0.0 for key in keys} for t in names}
+
+                for packets in traces:
+
+                    for p in packets:
+                        p.start_time = None
+                        p.end_time = None
+
+                    scheduler = scheduler_class(buffer_size)
+                    scheduler.run(list(packets))
+
+                    results = calculate_metrics(
+                        scheduler.transmitted_packets,
+                        scheduler.dropped_packets,
+                        simulation_time
+                    )
+
+                    for t in names:
+                        for key in keys:
+                            simulated[t][key] += \
+                                results[t][key] / len(traces)
+
+                predicted = estimate(
+                    name, arrival_rate, buffer_size,
+                    simulation_time=simulation_time
+                )
+
+                if verbose:
+                    print(
+                        f"\n--- {name} rate={arrival_rate} "
+                        f"buffer={buffer_size} time={simulation_time} ---"
+                    )
+
+                for t in names:
+
+                    sim = simulated[t]
+                    est = predicted[t]
+
+                    errors = worst[name][t]
+
+                    errors["loss_ratio"] = max(
+                        errors["loss_ratio"],
+                        abs(est["loss_ratio"] - sim["loss_ratio"])
+                    )
+
+                    if sim["loss_ratio"] <= MAX_DELAY_LOSS:
+                        errors["average_delay"] = max(
+                            errors["average_delay"],
+                            abs(est["average_delay"] -
+                                sim["average_delay"])
+                        )
+
+                    if verbose:
+                        print(
+                            f"{t:>5}  "
+                            f"delay sim={sim['average_delay']:.4f} "
+                            f"est={est['average_delay']:.4f}  "
+                            f"loss sim={sim['loss_ratio']:.3f} "
+                            f"est={est['loss_ratio']:.3f}"
+                        )
+
+    return worst
+
+
+def calibrate():
+    """
+    ERROR_BOUNDS as derived from the calibration seeds.
+    """
+
+    worst = validate(CALIBRATION_SEEDS)
+
+    return {
+        name: {
+            t: {
+                key: round(BOUND_MARGIN * error + BOUND_FLOOR[key], 3)
+                for key, error in errors.items()
+            }
+            for t, errors in classes.items()
+        }
+        for name, classes in worst.items()
+    }
+
+
+if __name__ == "__main__":
+
+    import sys
+
+    if "--calibrate" in sys.argv:
+        print(calibrate())
+        raise SystemExit(0)
+
+    worst = validate(HOLDOUT_SEEDS, verbose=True)
+
+    print("\n--- held-out worst absolute error (bound) ---")
+
+    within = True
+
+    for name, classes in worst.items():
+        for t, errors in classes.items():
+            for key, error in errors.items():
+                bound = ERROR_BOUNDS[name][t][key]
+                within = within and error <= bound
+                print(f"{name:>8} {t:>5} {key:<13} {error:.4f} ({bound})")
+
+    # Non-zero exit if the model has drifted past its documented bounds
+    raise SystemExit(0 if within else 1)
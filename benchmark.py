@@ -0,0 +1,155 @@
+# benchmark.py
+#
+# Event-loop throughput on a fixed, seeded overload trace. Prints
+# packets/sec and a fingerprint of everything the run produced, so a
+# faster loop can be checked to give the same results bit for bit.
+#
+# Timings on a shared machine drift by tens of percent between
+# processes, so compare two versions of scheduler.py in one process,
+# alternating runs:
+#
+#   git show HEAD~1:scheduler.py > /tmp/old_scheduler.py
+#   python3 benchmark.py --baseline /tmp/old_scheduler.py
+
+import argparse
+import hashlib
+import importlib.util
+import random
+import statistics
+import time
+
+import scheduler
+from traffic_generator import generate_traffic
+
+
+SIMULATION_TIME = 300
+ARRIVAL_RATE = 150      # ~1.8x the 1 Mbps link with the default classes
+SEED = 1
+
+CASES = [
+    ("Priority buf 50", "PriorityScheduler", 50),
+    ("Priority buf 500", "PriorityScheduler", 500),
+    ("WFQ buf 150", "WFQScheduler", 150),
+    ("PF buf 150", "PFScheduler", 150)
+]
+
+
+# ==========================================================
+# TRACE AND FINGERPRINT
+# ==========================================================
+
+def make_trace():
+
+    random.seed(SEED)
+
+    return generate_traffic(SIMULATION_TIME, ARRIVAL_RATE)
+
+
+def fingerprint(scheduler):
+    """
+    Hash of the transmitted and dropped order, per-packet start/end
+    times and the queue/time histories (floats via repr, so any
+    rounding difference changes it).
+    """
+
+    digest = hashlib.sha256()
+
+    for p in scheduler.transmitted_packets:
+        digest.update(f"{p.packet_id} {p.start_time!r} {p.end_time!r};".encode())
+
+    digest.update(b"|")
+
+    for p in scheduler.dropped_packets:
+        digest.update(f"{p.packet_id};".encode())
+
+    digest.update(repr(scheduler.queue_history).encode())
+    digest.update(repr(scheduler.time_history).encode())
+
+    return digest.hexdigest()[:16]
+
+
+# ==========================================================
+# TIMING
+# ==========================================================
+
+def load_module(path):
+
+    spec = importlib.util.spec_from_file_location("baseline_scheduler", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def run_once(scheduler_class, buffer_size, streamed):
+    """
+    One timed run on a freshly generated copy of the trace (packets
+    are mutated by a run). Returns (seconds, fingerprint).
+    """
+
+    packets = make_trace()
+    scheduler = scheduler_class(buffer_size)
+
+    start = time.perf_counter()
+    scheduler.run(iter(packets) if streamed else packets)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, fingerprint(scheduler)
+
+
+def compare(modules, repeats):
+    """
+    modules: {label: scheduler module}. Runs every case `repeats`
+    times per module, alternating between modules, and prints best
+    and median packets/sec with the fingerprint of each.
+    """
+
+    total = len(make_trace())
+
+    for label, class_name, buffer_size in CASES:
+        for streamed in (False, True):
+
+            times = {name: [] for name in modules}
+            digests = {}
+
+            for _ in range(repeats):
+                for name, module in modules.items():
+
+                    elapsed, digests[name] = run_once(
+                        getattr(module, class_name), buffer_size, streamed
+                    )
+                    times[name].append(elapsed)
+
+            path = "stream" if streamed else "list"
+
+            for name in modules:
+                print(
+                    f"{label:<17} {path:<7} {name:<9}"
+                    f"best {total / min(times[name]) / 1000:7.1f}k  "
+                    f"median {total / statistics.median(times[name]) / 1000:7.1f}k"
+                    f" pkt/s  {digests[name]}"
+                )
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Scheduler event-loop benchmark")
+    parser.add_argument(
+        "--repeats", type=int, default=15,
+        help="runs per case and version"
+    )
+    parser.add_argument(
+        "--baseline", metavar="PATH",
+        help="another scheduler.py to time against, alternating runs"
+    )
+    args = parser.parse_args()
+
+    modules = {"current": scheduler}
+
+    if args.baseline:
+        modules = {"baseline": load_module(args.baseline), **modules}
+
+    print(f"{ARRIVAL_RATE} pkt/s offered, {SIMULATION_TIME} s trace, "
+          f"seed {SEED}, {args.repeats} runs each\n")
+
+    compare(modules, args.repeats)
@@ -0,0 +1,406 @@
+# checkpoint.py
+#
+# Snapshot / restore of a running simulation: full scheduler state,
+# the packets not yet admitted and the traffic RNG position. The file
+# is a compressed numpy archive with a fixed layout: one JSON header
+# (scheduler type, registry tables, scalars, RNG state) plus typed
+# arrays for packet columns and numeric histories. Nothing in it is
+# executed on load, and the scheduler type is looked up in SCHEDULERS
+# only.
+
+import json
+import os
+import random
+
+import numpy as np
+
+from packet import Packet
+from scheduler import PriorityScheduler, WFQScheduler, PFScheduler
+from traffic_classes import (
+    ClassRegistry, TrafficClass, DEFAULT_CLASSES, DSCP_CLASSES,
+    get_registry
+)
+
+
+FORMAT = "qos-checkpoint/2"
+
+SCHEDULERS = {
+    "PriorityScheduler": PriorityScheduler,
+    "WFQScheduler": WFQScheduler,
+    "PFScheduler": PFScheduler
+}
+
+INT_FIELDS = ["packet_id", "size", "class_id"]
+FLOAT_FIELDS = ["arrival_time", "weight", "deadline",
+                "finish_time", "start_time", "end_time"]
+
+
+# ==========================================================
+# PACKET COLUMNS
+# ==========================================================
+
+def _pack_packets(packets, name, arrays):
+
+    for field in INT_FIELDS:
+        arrays[f"{name}.{field}"] = np.array(
+            [getattr(p, field) for p in packets], dtype=np.int64
+        )
+
+    for field in FLOAT_FIELDS:
+        # None (not yet scheduled) is stored as NaN
+        arrays[f"{name}.{field}"] = np.array([
+            np.nan if getattr(p, field) is None else getattr(p, field)
+            for p in packets
+        ], dtype=np.float64)
+
+
+def _unpack_packets(name, arrays, names):
+
+    columns = [arrays[f"{name}.{field}"].tolist()
+               for field in INT_FIELDS + FLOAT_FIELDS]
+
+    packets = []
+
+    for row in zip(*columns):
+
+        # Bypass __init__: class_id, weight and deadline come from
+        # the checkpoint, not from whatever registry is active now.
+        packet = Packet.__new__(Packet)
+
+        for field, value in zip(INT_FIELDS + FLOAT_FIELDS, row):
+            if value != value:  # NaN
+                value = None
+            setattr(packet, field, value)
+
+        packet.traffic_type = names[packet.class_id]
+
+        packets.append(packet)
+
+    return packets
+
+
+# ==========================================================
+# ATTRIBUTES
+# ==========================================================
+
+def _encode(value, name, arrays):
+    """
+    JSON description of one scheduler attribute. Bulk data goes
+    into arrays[name...]; anything of an unknown type is refused
+    rather than stored in a form that would need unpickling.
+    """
+
+    if isinstance(value, ClassRegistry):
+        return {"kind": "registry"}
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return {"kind": "value", "value": value}
+
+    if not isinstance(value, list):
+        raise TypeError(
+            f"Cannot checkpoint attribute {name!r} of type "
+            f"{type(value).__name__}"
+        )
+
+    if value and all(isinstance(item, Packet) for item in value):
+        _pack_packets(value, name, arrays)
+        return {"kind": "packets"}
+
+    # WFQ heap entries: (finish_time, packet_id, packet)
+    if value and all(isinstance(item, tuple) for item in value):
+        _pack_packets([entry[-1] for entry in value], name, arrays)
+        return {"kind": "heap"}
+
+    if value and all(isinstance(item, list) for item in value):
+        return {
+            "kind": "lists",
+            "items": [
+                _encode(item, f"{name}.{index}", arrays)
+                for index, item in enumerate(value)
+            ]
+        }
+
+    if value and all(type(item) is int for item in value):
+        arrays[name] = np.array(value, dtype=np.int64)
+        return {"kind": "ints"}
+
+    if value and all(type(item) is float for item in value):
+        arrays[name] = np.array(value, dtype=np.float64)
+        return {"kind": "floats"}
+
+    # Empty or short mixed int/float tables (e.g. WFQ last_finish)
+    if all(type(item) in (int, float) for item in value):
+        return {"kind": "value", "value": value}
+
+    raise TypeError(f"Cannot checkpoint list attribute {name!r}")
+
+
+def _decode(description, name, arrays, registry):
+
+    kind = description["kind"]
+
+    if kind == "value":
+        return description["value"]
+
+    if kind == "registry":
+        return registry
+
+    if kind == "packets":
+        return _unpack_packets(name, arrays, registry.names)
+
+    if kind == "heap":
+        return [
+            (p.finish_time, p.packet_id, p)
+            for p in _unpack_packets(name, arrays, registry.names)
+        ]
+
+    if kind == "lists":
+        return [
+            _decode(item, f"{name}.{index}", arrays, registry)
+            for index, item in enumerate(description["items"])
+        ]
+
+    if kind in ("ints", "floats"):
+        return arrays[name].tolist()
+
+    raise ValueError(f"Unknown checkpoint field kind {kind!r}")
+
+
+# ==========================================================
+# REGISTRY
+# ==========================================================
+
+def _describe_registry(registry):
+
+    return [
+        {
+            "name": c.name,
+            "weight": c.weight,
+            "deadline": c.deadline,
+            "size_range": list(c.size_range),
+            "share": c.share,
+            "delay_target": c.delay_target
+        }
+        for c in registry.classes
+    ]
+
+
+def _load_registry(description):
+
+    # Reuse the active registry or a preset when the tables match,
+    # so identity checks against them keep working after a load.
+    for registry in (get_registry(), DEFAULT_CLASSES, DSCP_CLASSES):
+        if _describe_registry(registry) == description:
+            return registry
+
+    return ClassRegistry([
+        TrafficClass(
+            c["name"], c["weight"], c["deadline"], tuple(c["size_range"]),
+            c["share"], c["delay_target"]
+        )
+        for c in description
+    ])
+
+
+# ==========================================================
+# RNG POSITION
+# ==========================================================
+
+def _rng_state(rng):
+
+    # Python's random module (generate_traffic) or a numpy Generator
+    if hasattr(rng, "bit_generator"):
+        return _plain(rng.bit_generator.state)
+
+    return _plain(rng.getstate())
+
+
+def _plain(value):
+
+    # JSON form of an RNG state: tuples and numpy arrays as lists
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+
+    if isinstance(value, (tuple, list)):
+        return [_plain(item) for item in value]
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    return value
+
+
+def _python_state(state):
+
+    version, internal, gauss_next = state
+
+    return version, tuple(internal), gauss_next
+
+
+def _set_rng_state(rng, state):
+
+    if hasattr(rng, "bit_generator"):
+        rng.bit_generator.state = state
+    else:
+        rng.setstate(_python_state(state))
+
+
+def _new_rng(state):
+
+    # numpy bit generator states are dicts naming their generator
+    if isinstance(state, dict):
+        bit_generator = getattr(np.random, state["bit_generator"])()
+        bit_generator.state = state
+        return np.random.Generator(bit_generator)
+
+    rng = random.Random()
+    rng.setstate(_python_state(state))
+    return rng
+
+
+# ==========================================================
+# SAVE / LOAD
+# ==========================================================
+
+def save_checkpoint(path, scheduler, pending_packets, rng=random):
+    """
+    scheduler: any scheduler in SCHEDULERS, mid-run
+    pending_packets: arrivals not yet admitted (from run_until)
+    rng: random module or numpy Generator driving traffic generation
+    """
+
+    scheduler_name = type(scheduler).__name__
+
+    if SCHEDULERS.get(scheduler_name) is not type(scheduler):
+        raise TypeError(f"Cannot checkpoint scheduler {scheduler_name}")
+
+    arrays = {}
+
+    header = {
+        "format": FORMAT,
+        "scheduler": scheduler_name,
+        "registry": _describe_registry(scheduler.registry),
+        "attributes": {
+            key: _encode(value, f"attr.{key}", arrays)
+            for key, value in vars(scheduler).items()
+        },
+        "pending": _encode(list(pending_packets), "pending", arrays),
+        "rng": _rng_state(rng) if rng is not None else None
+    }
+
+    arrays["header"] = np.frombuffer(
+        json.dumps(header).encode(), dtype=np.uint8
+    )
+
+    # Write-then-rename, so a crash mid-save keeps the old checkpoint
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+    os.replace(temp_path, path)
+
+
+def _read_checkpoint(path):
+
+    try:
+        with np.load(path, allow_pickle=False) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+    except (OSError, ValueError) as error:
+        raise ValueError(f"Not a QoS simulator checkpoint: {path}") from error
+
+    if "header" not in arrays:
+        raise ValueError(f"Not a QoS simulator checkpoint: {path}")
+
+    header = json.loads(arrays.pop("header").tobytes())
+
+    if header.get("format") != FORMAT:
+        raise ValueError(
+            f"Unsupported checkpoint format {header.get('format')!r}: {path}"
+        )
+
+    if header["scheduler"] not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler {header['scheduler']!r}: {path}")
+
+    return header, arrays
+
+
+def _restore(header, arrays):
+
+    registry = _load_registry(header["registry"])
+
+    scheduler_class = SCHEDULERS[header["scheduler"]]
+    scheduler = scheduler_class.__new__(scheduler_class)
+
+    for key, description in header["attributes"].items():
+        setattr(
+            scheduler, key,
+            _decode(description, f"attr.{key}", arrays, registry)
+        )
+
+    pending = _decode(header["pending"], "pending", arrays, registry)
+
+    return scheduler, pending
+
+
+def load_checkpoint(path, rng=random):
+    """
+    Returns (scheduler, pending_packets) and restores the RNG
+    position into rng, so the run continues where it left off.
+    """
+
+    header, arrays = _read_checkpoint(path)
+
+    if rng is not None and header["rng"] is not None:
+        _set_rng_state(rng, header["rng"])
+
+    return _restore(header, arrays)
+
+
+# ==========================================================
+# DRIVERS
+# ==========================================================
+
+def run_with_checkpoints(scheduler, packets, path, interval, rng=random):
+    """
+    Run to completion, saving a checkpoint every `interval`
+    simulated seconds. To resume after an interruption:
+
+        scheduler, pending = load_checkpoint(path)
+        run_with_checkpoints(scheduler, pending, path, interval)
+    """
+
+    pending = packets
+
+    while pending or scheduler.backlog():
+
+        pending = scheduler.run_until(
+            pending, scheduler.current_time + interval
+        )
+
+        save_checkpoint(path, scheduler, pending, rng)
+
+    return scheduler
+
+
+def fork_checkpoint(path, branches):
+    """
+    Load `branches` independent copies of a warmed-up state.
+    Returns (scheduler, pending_packets, rng) per branch; each rng
+    is a separate random.Random (or numpy Generator) at the saved
+    position, so branches never share a generator.
+    """
+
+    header, arrays = _read_checkpoint(path)
+
+    forks = []
+
+    for _ in range(branches):
+
+        scheduler, pending = _restore(header, arrays)
+
+        rng = _new_rng(header["rng"]) if header["rng"] is not None else None
+
+        forks.append((scheduler, pending, rng))
+
+    return forks
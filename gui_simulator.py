@@ -6,6 +6,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from traffic_generator import generate_traffic
 from scheduler import PriorityScheduler, WFQScheduler, PFScheduler
 from metrics import calculate_metrics, jains_fairness
+from traffic_classes import get_registry
+from analytical import estimate, error_bounds
 
 
 SIMULATION_TIME = 20
@@ -27,7 +29,8 @@ class QoSGUI:
         tk.Label(control_frame, text="Arrival Rate").pack()
         self.arrival_slider = tk.Scale(
             control_frame, from_=10, to=300,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=self.update_preview
         )
         self.arrival_slider.set(120)
         self.arrival_slider.pack()
@@ -36,7 +39,8 @@ class QoSGUI:
         tk.Label(control_frame, text="Buffer Size").pack()
         self.buffer_slider = tk.Scale(
             control_frame, from_=10, to=500,
-            orient=tk.HORIZONTAL
+            orient=tk.HORIZONTAL,
+            command=self.update_preview
         )
         self.buffer_slider.set(100)
         self.buffer_slider.pack()
@@ -53,6 +57,9 @@ class QoSGUI:
         )
         self.scheduler_combo.current(0)
         self.scheduler_combo.pack()
+        self.scheduler_combo.bind(
+            "<<ComboboxSelected>>", self.update_preview
+        )
 
         # Run Button
         tk.Button(
@@ -65,6 +72,10 @@ class QoSGUI:
         self.metrics_label = tk.Label(control_frame, text="")
         self.metrics_label.pack()
 
+        # Analytical Preview (updates as controls move)
+        self.preview_label = tk.Label(control_frame, text="", justify=tk.LEFT)
+        self.preview_label.pack()
+
         # -----------------------------
         # Graph Frame
         # -----------------------------
@@ -76,6 +87,56 @@ class QoSGUI:
         self.canvas = FigureCanvasTkAgg(self.figure, master=root)
         self.canvas.get_tk_widget().pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
+        self.update_preview()
+
+    # ------------------------------------------------
+    # ANALYTICAL PREVIEW
+    # ------------------------------------------------
+
+    def update_preview(self, _event=None):
+
+        # Sliders fire during construction, before the label exists
+        if not hasattr(self, "preview_label"):
+            return
+
+        scheduler_choice = self.scheduler_type.get()
+        arrival_rate = self.arrival_slider.get()
+        buffer_size = self.buffer_slider.get()
+
+        predicted = estimate(
+            scheduler_choice, arrival_rate, buffer_size,
+            simulation_time=SIMULATION_TIME
+        )
+
+        # Outside the validated region the estimate can be far off
+        # (see analytical.ERROR_BOUNDS), so say so instead of
+        # showing a bare number.
+        bounds = error_bounds(
+            scheduler_choice, arrival_rate, buffer_size, SIMULATION_TIME
+        )
+
+        if bounds is None:
+            lines = ["Estimate (delay / loss), no validated error bound:"]
+        else:
+            lines = ["Estimate (delay / loss) ± bound:"]
+
+        for traffic_type in get_registry().names:
+
+            delay = round(predicted[traffic_type]['average_delay'], 4)
+            loss = round(predicted[traffic_type]['loss_ratio'], 3)
+
+            if bounds is None:
+                lines.append(f"{traffic_type}: {delay} s / {loss}")
+            else:
+                bound = bounds[traffic_type]
+                lines.append(
+                    f"{traffic_type}: "
+                    f"{delay} ± {bound['average_delay']} s / "
+                    f"{loss} ± {bound['loss_ratio']}"
+                )
+
+        self.preview_label.config(text="\n".join(lines))
+
     # ------------------------------------------------
     # RUN SIMULATION
     # ------------------------------------------------
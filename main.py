@@ -1,8 +1,12 @@
 # main.py
 
+import argparse
+
 from traffic_generator import generate_traffic
 from scheduler import PriorityScheduler, WFQScheduler, PFScheduler
 from metrics import calculate_metrics, jains_fairness
+from traffic_classes import get_registry
+from report import summarize_run, generate_report
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 
@@ -90,6 +94,13 @@ def live_visualization(priority_scheduler, wfq_scheduler, pf_scheduler):
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="QoS scheduler comparison")
+    parser.add_argument(
+        "--report", metavar="PATH",
+        help="write a static HTML report instead of showing plot windows"
+    )
+    args = parser.parse_args()
+
     packets = generate_traffic(SIMULATION_TIME, ARRIVAL_RATE)
 
     # Run all schedulers
@@ -104,7 +115,7 @@ if __name__ == "__main__":
 
     print("\n========= QoS COMPARISON RESULTS =========\n")
 
-    for traffic_type in ["voice", "video", "data"]:
+    for traffic_type in get_registry().names:
 
         print(f"\n--- {traffic_type.upper()} ---")
 
@@ -145,58 +156,76 @@ if __name__ == "__main__":
           round(pf_fairness, 4))
 
     # ======================================================
-    # STATIC BAR GRAPHS (NOW 3 BARS)
+    # HTML REPORT (NO DISPLAY NEEDED)
     # ======================================================
 
-    traffic_types = ["voice", "video", "data"]
+    if args.report:
 
-    priority_delays = [priority_results[t]["average_delay"] for t in traffic_types]
-    wfq_delays = [wfq_results[t]["average_delay"] for t in traffic_types]
-    pf_delays = [pf_results[t]["average_delay"] for t in traffic_types]
+        runs = [
+            summarize_run("Priority", priority_scheduler, SIMULATION_TIME),
+            summarize_run("WFQ", wfq_scheduler, SIMULATION_TIME),
+            summarize_run("PF", pf_scheduler, SIMULATION_TIME)
+        ]
 
-    priority_losses = [priority_results[t]["loss_ratio"] for t in traffic_types]
-    wfq_losses = [wfq_results[t]["loss_ratio"] for t in traffic_types]
-    pf_losses = [pf_results[t]["loss_ratio"] for t in traffic_types]
+        generate_report(runs, args.report)
 
-    x = range(len(traffic_types))
-    width = 0.25
+        print("\nReport written to", args.report)
 
-    # Delay Comparison
-    plt.figure()
-    plt.bar([i - width for i in x], priority_delays,
-            width=width, label="Priority")
+    else:
 
-    plt.bar(x, wfq_delays,
-            width=width, label="WFQ")
+        # ======================================================
+        # STATIC BAR GRAPHS (NOW 3 BARS)
+        # ======================================================
 
-    plt.bar([i + width for i in x], pf_delays,
-            width=width, label="PF")
+        traffic_types = get_registry().names
 
-    plt.xticks(x, traffic_types)
-    plt.title("Average Delay Comparison")
-    plt.ylabel("Delay (sec)")
-    plt.legend()
-    plt.show()
+        priority_delays = [priority_results[t]["average_delay"] for t in traffic_types]
+        wfq_delays = [wfq_results[t]["average_delay"] for t in traffic_types]
+        pf_delays = [pf_results[t]["average_delay"] for t in traffic_types]
 
-    # Loss Comparison
-    plt.figure()
-    plt.bar([i - width for i in x], priority_losses,
-            width=width, label="Priority")
+        priority_losses = [priority_results[t]["loss_ratio"] for t in traffic_types]
+        wfq_losses = [wfq_results[t]["loss_ratio"] for t in traffic_types]
+        pf_losses = [pf_results[t]["loss_ratio"] for t in traffic_types]
 
-    plt.bar(x, wfq_losses,
-            width=width, label="WFQ")
+        x = range(len(traffic_types))
+        width = 0.25
 
-    plt.bar([i + width for i in x], pf_losses,
-            width=width, label="PF")
+        # Delay Comparison
+        plt.figure()
+        plt.bar([i - width for i in x], priority_delays,
+                width=width, label="Priority")
 
-    plt.xticks(x, traffic_types)
-    plt.title("Packet Loss Comparison")
-    plt.ylabel("Loss Ratio")
-    plt.legend()
-    plt.show()
+        plt.bar(x, wfq_delays,
+                width=width, label="WFQ")
 
-    # ======================================================
-    # REAL-TIME QUEUE ANIMATION
-    # ======================================================
+        plt.bar([i + width for i in x], pf_delays,
+                width=width, label="PF")
+
+        plt.xticks(x, traffic_types)
+        plt.title("Average Delay Comparison")
+        plt.ylabel("Delay (sec)")
+        plt.legend()
+        plt.show()
+
+        # Loss Comparison
+        plt.figure()
+        plt.bar([i - width for i in x], priority_losses,
+                width=width, label="Priority")
+
+        plt.bar(x, wfq_losses,
+                width=width, label="WFQ")
+
+        plt.bar([i + width for i in x], pf_losses,
+                width=width, label="PF")
+
+        plt.xticks(x, traffic_types)
+        plt.title("Packet Loss Comparison")
+        plt.ylabel("Loss Ratio")
+        plt.legend()
+        plt.show()
+
+        # ======================================================
+        # REAL-TIME QUEUE ANIMATION
+        # ======================================================
 
-    live_visualization(priority_scheduler, wfq_scheduler, pf_scheduler)
+        live_visualization(priority_scheduler, wfq_scheduler, pf_scheduler)
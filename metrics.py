@@ -1,24 +1,32 @@
 # metrics.py
 
-from collections import defaultdict
+import numpy as np
 
+from traffic_classes import get_registry
 
-def calculate_metrics(transmitted_packets, dropped_packets, simulation_time):
 
-    stats = defaultdict(list)
+def calculate_metrics(transmitted_packets, dropped_packets, simulation_time,
+                      registry=None, start_time=0):
+
+    registry = registry or get_registry()
+
+    # Separate packets by class_id
+    delays_by_class = [[] for _ in range(len(registry))]
+    dropped_by_class = [0] * len(registry)
 
-    # Separate packets by type
     for p in transmitted_packets:
-        delay = p.end_time - p.arrival_time
-        stats[p.traffic_type].append(delay)
+        delays_by_class[p.class_id].append(p.end_time - p.arrival_time)
+
+    for p in dropped_packets:
+        dropped_by_class[p.class_id] += 1
 
     results = {}
 
     total_bits = 0
 
-    for traffic_type in ["voice", "video", "data"]:
+    for class_id, traffic_type in enumerate(registry.names):
 
-        delays = stats[traffic_type]
+        delays = delays_by_class[class_id]
 
         if delays:
             avg_delay = sum(delays) / len(delays)
@@ -26,7 +34,7 @@ def calculate_metrics(transmitted_packets, dropped_packets, simulation_time):
             avg_delay = 0
 
         transmitted_count = len(delays)
-        dropped_count = len([p for p in dropped_packets if p.traffic_type == traffic_type])
+        dropped_count = dropped_by_class[class_id]
 
         loss_ratio = dropped_count / (transmitted_count + dropped_count) \
             if (transmitted_count + dropped_count) > 0 else 0
@@ -39,23 +47,32 @@ def calculate_metrics(transmitted_packets, dropped_packets, simulation_time):
         }
 
     # Throughput
+    last_end = 0
+
     for p in transmitted_packets:
         total_bits += p.size
+        last_end = max(last_end, p.end_time)
+
+    # Schedulers keep draining past simulation_time
+    duration = max(simulation_time, last_end) - start_time
 
-    throughput = total_bits / simulation_time  # bits per second
+    throughput = total_bits / duration if duration > 0 else 0  # bits per second
 
     results["overall_throughput"] = throughput
 
     return results
 
-def jains_fairness(transmitted_packets):
+def jains_fairness(transmitted_packets, registry=None):
+
+    registry = registry or get_registry()
 
-    throughput_per_type = defaultdict(int)
+    throughput_per_class = [0] * len(registry)
 
     for p in transmitted_packets:
-        throughput_per_type[p.traffic_type] += p.size
+        throughput_per_class[p.class_id] += p.size
 
-    values = list(throughput_per_type.values())
+    # Only classes that carried traffic take part
+    values = [v for v in throughput_per_class if v]
 
     if not values:
         return 0
@@ -67,3 +84,134 @@ def jains_fairness(transmitted_packets):
         return 0
 
     return numerator / denominator
+
+
+# ==========================================================
+# TIME-WINDOWED METRICS
+# ==========================================================
+
+def _packet_arrays(packets, with_end=True):
+
+    count = len(packets)
+
+    arrival = np.fromiter((p.arrival_time for p in packets), float, count)
+    class_ids = np.fromiter((p.class_id for p in packets), np.int64, count)
+
+    if not with_end:
+        return arrival, class_ids
+
+    end = np.fromiter((p.end_time for p in packets), float, count)
+    sizes = np.fromiter((p.size for p in packets), float, count)
+
+    return arrival, class_ids, end, sizes
+
+
+def windowed_metrics(transmitted_packets, dropped_packets, window,
+                     registry=None):
+    """
+    Per-interval series in one vectorized pass:
+    throughput and delay are binned by completion time, loss by
+    arrival time (drops have no completion time).
+    """
+
+    registry = registry or get_registry()
+    classes = len(registry)
+
+    arrival, class_ids, end, sizes = _packet_arrays(transmitted_packets)
+    drop_arrival, drop_ids = _packet_arrays(dropped_packets, with_end=False)
+
+    horizon = max(
+        end.max() if end.size else 0,
+        drop_arrival.max() if drop_arrival.size else 0
+    )
+    windows = int(horizon // window) + 1
+
+    # Flattened (class, window) bins so every class is one bincount
+    tx_bin = class_ids * windows + (end // window).astype(np.int64)
+    tx_arrival_bin = class_ids * windows + \
+        (arrival // window).astype(np.int64)
+    drop_bin = drop_ids * windows + (drop_arrival // window).astype(np.int64)
+
+    bins = classes * windows
+
+    completed = np.bincount(tx_bin, minlength=bins)
+    delay_sum = np.bincount(tx_bin, weights=end - arrival, minlength=bins)
+    bits = np.bincount(tx_bin, weights=sizes, minlength=bins)
+
+    delivered = np.bincount(tx_arrival_bin, minlength=bins)
+    dropped = np.bincount(drop_bin, minlength=bins)
+
+    completed = completed.reshape(classes, windows)
+    delay_sum = delay_sum.reshape(classes, windows)
+    offered = (delivered + dropped).reshape(classes, windows)
+    dropped = dropped.reshape(classes, windows)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delay = delay_sum / completed
+        loss = dropped / offered
+        overall_delay = delay_sum.sum(axis=0) / completed.sum(axis=0)
+
+    return {
+        "window_start": np.arange(windows) * window,
+        "throughput": bits.reshape(classes, windows).sum(axis=0) / window,
+        "overall_delay": overall_delay,
+        "delay": dict(zip(registry.names, delay)),
+        "loss_ratio": dict(zip(registry.names, loss))
+    }
+
+
+def mser_truncation(series):
+    """
+    MSER warm-up detection. Returns the index d minimising
+    sum((x[d:] - mean(x[d:]))**2) / (n - d)**2, searched over
+    the first half of the series. NaN entries are ignored.
+    """
+
+    values = np.asarray(series, dtype=float)
+    positions = np.flatnonzero(~np.isnan(values))
+    values = values[positions]
+
+    n = values.size
+
+    if n < 4:
+        return 0
+
+    # Suffix sums give every candidate's statistic at once
+    tail_count = np.arange(n, 0, -1)
+    tail_sum = np.cumsum(values[::-1])[::-1]
+    tail_sq = np.cumsum((values ** 2)[::-1])[::-1]
+
+    variance_sum = tail_sq - tail_sum ** 2 / tail_count
+    statistic = variance_sum / tail_count ** 2
+
+    best = int(np.argmin(statistic[:n // 2]))
+
+    return int(positions[best])
+
+
+def steady_state_metrics(transmitted_packets, dropped_packets,
+                         simulation_time, window=0.5, registry=None):
+    """
+    calculate_metrics over the steady-state part of the run only.
+    The warm-up is found with MSER on the windowed delay series;
+    packets arriving before it are discarded.
+    """
+
+    series = windowed_metrics(
+        transmitted_packets, dropped_packets, window, registry
+    )
+
+    cut = mser_truncation(series["overall_delay"])
+    warmup_end = float(series["window_start"][cut])
+
+    results = calculate_metrics(
+        [p for p in transmitted_packets if p.arrival_time >= warmup_end],
+        [p for p in dropped_packets if p.arrival_time >= warmup_end],
+        simulation_time,
+        registry,
+        start_time=warmup_end
+    )
+
+    results["warmup_end"] = warmup_end
+
+    return results
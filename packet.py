@@ -1,36 +1,41 @@
 # packet.py
 
+from traffic_classes import get_registry
+
+
 class Packet:
-    def __init__(self, packet_id, arrival_time, size, traffic_type):
+    def __init__(self, packet_id, arrival_time, size, traffic_type=None,
+                 registry=None, class_id=None):
+        # registry must match the one the scheduler is built with;
+        # class_id indexes its per-class tables. Generators pass
+        # class_id directly; hand-built packets may name the class.
+        registry = registry or get_registry()
+
+        if class_id is None:
+            class_id = registry.class_id(traffic_type)
+        else:
+            traffic_type = registry.names[class_id]
+
         self.packet_id = packet_id
         self.arrival_time = arrival_time
         self.size = size  # in bits
         self.traffic_type = traffic_type
+        self.class_id = class_id
 
         # QoS parameters
-        self.weight = self.assign_weight()
-        self.deadline = self.assign_deadline()
+        self.weight = self.assign_weight(registry)
+        self.deadline = self.assign_deadline(registry)
 
         # Scheduling parameters
         self.finish_time = 0
         self.start_time = None
         self.end_time = None
 
-    def assign_weight(self):
-        if self.traffic_type == "voice":
-            return 5
-        elif self.traffic_type == "video":
-            return 3
-        else:
-            return 1
+    def assign_weight(self, registry):
+        return registry.weights[self.class_id]
 
-    def assign_deadline(self):
-        if self.traffic_type == "voice":
-            return 0.05  # 50 ms
-        elif self.traffic_type == "video":
-            return 0.15  # 150 ms
-        else:
-            return 1.0  # 1 second
+    def assign_deadline(self, registry):
+        return registry.deadlines[self.class_id]
 
     def __repr__(self):
         return f"Packet(id={self.packet_id}, type={self.traffic_type}, arrival={self.arrival_time})"
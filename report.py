@@ -0,0 +1,280 @@
+# report.py
+#
+# Static HTML comparison report. Plots are rendered with the
+# non-interactive Agg canvas in worker processes and embedded as
+# base64 PNGs, so the report is a single file and no display is
+# needed (e.g. for nightly sweeps).
+
+import base64
+import html
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import calculate_metrics, jains_fairness
+from traffic_classes import get_registry
+
+
+PERCENTILES = [50, 90, 99]
+
+MAX_HISTORY_POINTS = 2000
+
+
+# ==========================================================
+# RUN SUMMARIES
+# ==========================================================
+
+def _percentile(sorted_values, q):
+
+    if not sorted_values:
+        return 0
+
+    index = round(q / 100 * (len(sorted_values) - 1))
+
+    return sorted_values[index]
+
+
+def summarize_run(name, scheduler, simulation_time, registry=None):
+    """
+    Reduce a finished scheduler to a small picklable summary
+    that can be shipped to worker processes.
+    """
+
+    registry = registry or get_registry()
+
+    delays = [[] for _ in range(len(registry))]
+
+    for p in scheduler.transmitted_packets:
+        delays[p.class_id].append(p.end_time - p.arrival_time)
+
+    percentiles = {}
+
+    for class_id, traffic_type in enumerate(registry.names):
+
+        class_delays = sorted(delays[class_id])
+
+        percentiles[traffic_type] = {
+            q: _percentile(class_delays, q) for q in PERCENTILES
+        }
+
+    # Thin long histories; the plot cannot show more points anyway
+    stride = max(1, len(scheduler.time_history) // MAX_HISTORY_POINTS)
+
+    return {
+        "name": name,
+        "classes": list(registry.names),
+        "metrics": calculate_metrics(
+            scheduler.transmitted_packets,
+            scheduler.dropped_packets,
+            simulation_time,
+            registry
+        ),
+        "fairness": jains_fairness(scheduler.transmitted_packets, registry),
+        "percentiles": percentiles,
+        "time_history": scheduler.time_history[::stride],
+        "queue_history": scheduler.queue_history[::stride]
+    }
+
+
+# ==========================================================
+# PLOTS (run in worker processes)
+# ==========================================================
+
+def _grouped_bars(ax, runs, values_for_run):
+
+    classes = runs[0]["classes"]
+    width = 0.8 / len(runs)
+
+    for position, run in enumerate(runs):
+
+        offset = (position - (len(runs) - 1) / 2) * width
+
+        ax.bar(
+            [i + offset for i in range(len(classes))],
+            values_for_run(run),
+            width=width,
+            label=run["name"]
+        )
+
+    ax.set_xticks(range(len(classes)))
+    ax.set_xticklabels(classes)
+    ax.legend()
+
+
+def _plot_delay(ax, runs):
+
+    _grouped_bars(ax, runs, lambda run: [
+        run["metrics"][t]["average_delay"] for t in run["classes"]
+    ])
+    ax.set_title("Average Delay Comparison")
+    ax.set_ylabel("Delay (sec)")
+
+
+def _plot_loss(ax, runs):
+
+    _grouped_bars(ax, runs, lambda run: [
+        run["metrics"][t]["loss_ratio"] for t in run["classes"]
+    ])
+    ax.set_title("Packet Loss Comparison")
+    ax.set_ylabel("Loss Ratio")
+
+
+def _plot_percentiles(ax, runs):
+
+    q = PERCENTILES[-1]
+
+    _grouped_bars(ax, runs, lambda run: [
+        run["percentiles"][t][q] for t in run["classes"]
+    ])
+    ax.set_title(f"p{q} Delay Comparison")
+    ax.set_ylabel("Delay (sec)")
+
+
+def _plot_fairness(ax, runs):
+
+    names = [run["name"] for run in runs]
+
+    ax.bar(range(len(runs)), [run["fairness"] for run in runs])
+    ax.set_xticks(range(len(runs)))
+    ax.set_xticklabels(names)
+    ax.set_ylim(0, 1)
+    ax.set_title("Jain's Fairness Index")
+
+
+def _plot_queue(ax, runs):
+
+    for run in runs:
+        ax.plot(run["time_history"], run["queue_history"], label=run["name"])
+
+    ax.set_title("Queue Size Evolution")
+    ax.set_xlabel("Time (sec)")
+    ax.set_ylabel("Queue Length")
+    ax.legend()
+
+
+PLOTS = {
+    "delay": _plot_delay,
+    "loss": _plot_loss,
+    "percentiles": _plot_percentiles,
+    "fairness": _plot_fairness,
+    "queue": _plot_queue
+}
+
+
+def render_plot(kind, runs):
+    """
+    Render one plot to PNG bytes. Uses the Agg canvas directly
+    (no pyplot), so it never touches a GUI backend.
+    """
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(7, 4))
+    FigureCanvasAgg(figure)
+
+    PLOTS[kind](figure.add_subplot(), runs)
+
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=100)
+
+    return buffer.getvalue()
+
+
+# ==========================================================
+# HTML
+# ==========================================================
+
+def _metrics_table(runs):
+
+    rows = []
+
+    for run in runs:
+        for traffic_type in run["classes"]:
+
+            stats = run["metrics"][traffic_type]
+            percentiles = run["percentiles"][traffic_type]
+
+            cells = [
+                run["name"],
+                traffic_type,
+                f"{stats['average_delay']:.4f}",
+                *(f"{percentiles[q]:.4f}" for q in PERCENTILES),
+                f"{stats['loss_ratio']:.4f}",
+                str(stats["transmitted"]),
+                str(stats["dropped"])
+            ]
+
+            rows.append(
+                "<tr>" +
+                "".join(f"<td>{html.escape(c)}</td>" for c in cells) +
+                "</tr>"
+            )
+
+    headers = ["Run", "Class", "Avg Delay"] + \
+        [f"p{q}" for q in PERCENTILES] + \
+        ["Loss Ratio", "Transmitted", "Dropped"]
+
+    header = "".join(f"<th>{h}</th>" for h in headers)
+
+    summary = "".join(
+        f"<tr><td>{html.escape(run['name'])}</td>"
+        f"<td>{run['metrics']['overall_throughput']:.2f}</td>"
+        f"<td>{run['fairness']:.4f}</td></tr>"
+        for run in runs
+    )
+
+    return (
+        f"<table><tr>{header}</tr>{''.join(rows)}</table>"
+        "<table><tr><th>Run</th><th>Throughput (bps)</th>"
+        f"<th>Jain's Fairness</th></tr>{summary}</table>"
+    )
+
+
+def generate_report(runs, path, title="QoS Comparison Report", workers=None):
+    """
+    runs: summaries from summarize_run(), any number of them
+    path: output .html file
+    workers: process count for rendering (default: one per CPU)
+    """
+
+    if not runs:
+        raise ValueError("No runs to report")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            kind: pool.submit(render_plot, kind, runs) for kind in PLOTS
+        }
+        images = {kind: future.result() for kind, future in futures.items()}
+
+    figures = "".join(
+        '<img src="data:image/png;base64,'
+        f'{base64.b64encode(images[kind]).decode("ascii")}" alt="{kind}">'
+        for kind in PLOTS
+    )
+
+    document = f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1.5em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+img {{ max-width: 48%; margin: 0.5%; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+{_metrics_table(runs)}
+{figures}
+</body>
+</html>
+"""
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(document)
+
+    return path
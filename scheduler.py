@@ -1,21 +1,133 @@
 import heapq
 
+from traffic_classes import get_registry
+
 LINK_BANDWIDTH = 1_000_000  # 1 Mbps
 
 
+# ==========================================================
+# COMMON EVENT LOOP
+# ==========================================================
+
+class Scheduler:
+    """
+    Shared arrival/transmit loop. Subclasses provide add_packet,
+    select_packet, transmit (True if sent, False if dropped)
+    and backlog.
+    """
+
+    def run(self, packets):
+        """
+        packets: a list (sorted here), or any iterator already in
+        arrival order, e.g. TrafficBatch.packets(), which is
+        streamed without building the full list.
+        """
+
+        if isinstance(packets, list):
+            self.run_until(packets, float("inf"))
+            return
+
+        for _ in self.stream(packets):
+            pass
+
+    # ------------------------------------------------------
+
+    def check_packet(self, packet):
+
+        # Per-class tables are indexed by class_id, so a packet built
+        # against another registry would be silently relabelled.
+        names = self.registry.names
+
+        if packet.class_id >= len(names) or \
+                names[packet.class_id] != packet.traffic_type:
+            raise ValueError(
+                f"Packet class {packet.traffic_type!r} (id {packet.class_id}) "
+                "does not belong to this scheduler's registry"
+            )
+
+    # ------------------------------------------------------
+
+    def run_until(self, packets, stop_time):
+        """
+        Simulate until current_time reaches stop_time (or all
+        traffic is served). Returns the packets not yet admitted,
+        so the run can be continued later with run()/run_until().
+        """
+
+        packets.sort(key=lambda p: p.arrival_time)
+
+        index = 0
+        total_packets = len(packets)
+
+        while (index < total_packets or self.backlog()) and \
+                self.current_time < stop_time:
+
+            while index < total_packets and \
+                  packets[index].arrival_time <= self.current_time:
+
+                self.check_packet(packets[index])
+                self.add_packet(packets[index])
+                index += 1
+
+            packet = self.select_packet()
+
+            if packet:
+                self.transmit(packet)
+            else:
+                if index < total_packets:
+                    self.current_time = packets[index].arrival_time
+                else:
+                    break
+
+        return packets[index:]
+
+    # ------------------------------------------------------
+
+    def stream(self, arrivals):
+        """
+        Generator form of the event loop for chaining hops.
+        arrivals: iterator of packets in arrival order (it is
+        only advanced as far as the next arrival).
+        Yields each packet as it finishes transmission, so
+        departures come out in end_time order.
+        """
+
+        arrivals = iter(arrivals)
+        upcoming = next(arrivals, None)
+
+        while upcoming is not None or self.backlog():
+
+            while upcoming is not None and \
+                  upcoming.arrival_time <= self.current_time:
+
+                self.check_packet(upcoming)
+                self.add_packet(upcoming)
+                upcoming = next(arrivals, None)
+
+            packet = self.select_packet()
+
+            if packet:
+                if self.transmit(packet):
+                    yield packet
+            elif upcoming is not None:
+                self.current_time = upcoming.arrival_time
+
+
 # ==========================================================
 # PRIORITY SCHEDULER
 # ==========================================================
 
-class PriorityScheduler:
+class PriorityScheduler(Scheduler):
 
-    def __init__(self, buffer_size=50):
+    def __init__(self, buffer_size=50, registry=None):
 
         self.buffer_size = buffer_size
 
-        self.voice_queue = []
-        self.video_queue = []
-        self.data_queue = []
+        self.registry = registry or get_registry()
+
+        # One FIFO per class, indexed by class_id (0 = highest priority)
+        self.queues = [[] for _ in range(len(self.registry))]
+        self.queue_length = 0
 
         self.current_time = 0
 
@@ -27,38 +139,123 @@ class PriorityScheduler:
 
     # ------------------------------------------------------
 
-    def add_packet(self, packet):
+    def run_until(self, packets, stop_time):
 
-        if packet.traffic_type == "voice":
-            if len(self.voice_queue) < self.buffer_size:
-                self.voice_queue.append(packet)
-            else:
-                self.dropped_packets.append(packet)
+        # Same events as Scheduler.run_until, but between two arrivals
+        # every decision is already known: empty the queues in
+        # priority order, FIFO within a class. Each backlogged stretch
+        # is served in one pass (queue trimmed once, not a pop(0) per
+        # packet) and all state lives in locals until the end.
+        # Admission, drop rule and timing match add_packet/transmit.
+        packets.sort(key=lambda p: p.arrival_time)
 
-        elif packet.traffic_type == "video":
-            if len(self.video_queue) < self.buffer_size:
-                self.video_queue.append(packet)
-            else:
-                self.dropped_packets.append(packet)
+        names = self.registry.names
+        queues = self.queues
+        buffer_size = self.buffer_size
 
-        else:
-            if len(self.data_queue) < self.buffer_size:
-                self.data_queue.append(packet)
-            else:
-                self.dropped_packets.append(packet)
+        transmitted = self.transmitted_packets
+        dropped = self.dropped_packets
+        queue_history = self.queue_history
+        time_history = self.time_history
+
+        now = self.current_time
+        length = self.queue_length
+
+        index = 0
+        total_packets = len(packets)
+
+        next_arrival = packets[0].arrival_time if packets else float("inf")
+
+        while (index < total_packets or length) and now < stop_time:
+
+            while next_arrival <= now:
+
+                packet = packets[index]
+                class_id = packet.class_id
+
+                if class_id >= len(names) or \
+                        names[class_id] != packet.traffic_type:
+                    self.current_time = now
+                    self.queue_length = length
+                    self.check_packet(packet)
+
+                queue = queues[class_id]
+
+                if len(queue) < buffer_size:
+                    queue.append(packet)
+                    length += 1
+                else:
+                    dropped.append(packet)
+
+                index += 1
+
+                if index < total_packets:
+                    next_arrival = packets[index].arrival_time
+                else:
+                    next_arrival = float("inf")
+
+            if not length:
+                if index < total_packets:
+                    now = next_arrival
+                    continue
+                break
+
+            until = min(next_arrival, stop_time)
+
+            for queue in queues:
+
+                served = 0
+
+                for packet in queue:
+
+                    if now >= until:
+                        break
+
+                    served += 1
+                    length -= 1
+
+                    if now - packet.arrival_time > packet.deadline:
+                        dropped.append(packet)
+                        continue
+
+                    packet.start_time = now
+                    now += packet.size / LINK_BANDWIDTH
+                    packet.end_time = now
+
+                    transmitted.append(packet)
+                    queue_history.append(length)
+                    time_history.append(now)
+
+                del queue[:served]
+
+                if now >= until:
+                    break
+
+        self.current_time = now
+        self.queue_length = length
+
+        return packets[index:]
 
     # ------------------------------------------------------
 
-    def select_packet(self):
+    def add_packet(self, packet):
+
+        queue = self.queues[packet.class_id]
+
+        if len(queue) < self.buffer_size:
+            queue.append(packet)
+            self.queue_length += 1
+        else:
+            self.dropped_packets.append(packet)
 
-        if self.voice_queue:
-            return self.voice_queue.pop(0)
+    # ------------------------------------------------------
 
-        if self.video_queue:
-            return self.video_queue.pop(0)
+    def select_packet(self):
 
-        if self.data_queue:
-            return self.data_queue.pop(0)
+        for queue in self.queues:
+            if queue:
+                self.queue_length -= 1
+                return queue.pop(0)
 
         return None
 
@@ -70,7 +267,7 @@ class PriorityScheduler:
 
         if waiting_time > packet.deadline:
             self.dropped_packets.append(packet)
-            return
+            return False
 
         packet.start_time = self.current_time
 
@@ -81,54 +278,35 @@ class PriorityScheduler:
 
         self.transmitted_packets.append(packet)
 
-        total_q = (
-            len(self.voice_queue) +
-            len(self.video_queue) +
-            len(self.data_queue)
-        )
-
-        self.queue_history.append(total_q)
+        self.queue_history.append(self.queue_length)
         self.time_history.append(self.current_time)
 
-    # ------------------------------------------------------
-
-    def run(self, packets):
-
-        packets.sort(key=lambda p: p.arrival_time)
-
-        index = 0
-        total_packets = len(packets)
-
-        while index < total_packets or \
-              self.voice_queue or self.video_queue or self.data_queue:
-
-            while index < total_packets and \
-                  packets[index].arrival_time <= self.current_time:
-
-                self.add_packet(packets[index])
-                index += 1
+        return True
 
-            packet = self.select_packet()
+    # ------------------------------------------------------
 
-            if packet:
-                self.transmit(packet)
-            else:
-                if index < total_packets:
-                    self.current_time = packets[index].arrival_time
-                else:
-                    break
+    def backlog(self):
+        return self.queue_length
 
 
 # ==========================================================
 # WEIGHTED FAIR QUEUING (WFQ)
 # ==========================================================
 
-class WFQScheduler:
+class WFQScheduler(Scheduler):
+
+    EWMA_ALPHA = 0.05       # smoothing of per-class delay and loss
+    ADAPT_INTERVAL = 0.1    # seconds between weight updates
+    WEIGHT_GAIN = 0.1       # boost per interval, fraction of base weight
+    WEIGHT_DECAY = 0.2      # pull toward base weight per interval
+    LOSS_TARGET = 0.01      # loss ratio treated as on target
 
-    def __init__(self, buffer_size=150):
+    def __init__(self, buffer_size=150, registry=None):
 
         self.buffer_size = buffer_size
 
+        self.registry = registry or get_registry()
+
         self.virtual_time = 0
         self.heap = []
 
@@ -137,20 +315,20 @@ class WFQScheduler:
         self.transmitted_packets = []
         self.dropped_packets = []
 
-        self.weights = {
-            "voice": 5.0,
-            "video": 3.0,
-            "data": 1.0
-        }
+        # Per-class tables indexed by class_id
+        self.base_weights = list(self.registry.weights)
+        self.weights = list(self.base_weights)
 
         self.MIN_WEIGHT = 0.5
         self.MAX_WEIGHT = 10.0
 
-        self.last_finish = {
-            "voice": 0,
-            "video": 0,
-            "data": 0
-        }
+        self.last_finish = [0] * len(self.registry)
+
+        # Windowed weight controller state; only classes with a
+        # delay target are boosted.
+        self.ewma_delay = [0.0] * len(self.registry)
+        self.ewma_loss = [0.0] * len(self.registry)
+        self.next_adapt_time = self.ADAPT_INTERVAL
 
         self.queue_history = []
         self.time_history = []
@@ -161,19 +339,30 @@ class WFQScheduler:
 
         if len(self.heap) >= self.buffer_size:
             self.dropped_packets.append(packet)
+            self.record_outcome(packet.class_id, lost=True)
             return
 
-        weight = self.weights[packet.traffic_type]
+        class_id = packet.class_id
 
-        start = max(self.virtual_time,
-                    self.last_finish[packet.traffic_type])
+        weight = self.weights[class_id]
+
+        start = max(self.virtual_time, self.last_finish[class_id])
 
         finish = start + (packet.size / weight)
 
         packet.finish_time = finish
-        self.last_finish[packet.traffic_type] = finish
+        self.last_finish[class_id] = finish
 
-        heapq.heappush(self.heap, (finish, packet))
+        heapq.heappush(self.heap, (finish, packet.packet_id, packet))
+
+    # ------------------------------------------------------
+
+    def select_packet(self):
+
+        if self.heap:
+            return heapq.heappop(self.heap)[-1]
+
+        return None
 
     # ------------------------------------------------------
 
@@ -183,7 +372,8 @@ class WFQScheduler:
 
         if waiting_time > packet.deadline:
             self.dropped_packets.append(packet)
-            return
+            self.record_outcome(packet.class_id, True, waiting_time)
+            return False
 
         packet.start_time = self.current_time
 
@@ -198,74 +388,98 @@ class WFQScheduler:
 
         delay = packet.end_time - packet.arrival_time
 
-        if packet.traffic_type == "voice" and delay > 0.04:
-            self.weights["voice"] *= 1.05
-
-        elif packet.traffic_type == "video" and delay > 0.12:
-            self.weights["video"] *= 1.03
-
-        for key in self.weights:
-            self.weights[key] = max(
-                self.MIN_WEIGHT,
-                min(self.weights[key], self.MAX_WEIGHT)
-            )
+        self.record_outcome(packet.class_id, False, delay)
 
         self.queue_history.append(len(self.heap))
         self.time_history.append(self.current_time)
 
+        return True
+
     # ------------------------------------------------------
 
-    def run(self, packets):
+    def record_outcome(self, class_id, lost, delay=None):
 
-        packets.sort(key=lambda p: p.arrival_time)
+        # Buffer and late drops count as loss; late drops also feed
+        # the delay EWMA, otherwise an overloaded class only ever
+        # reports the delays of its survivors.
+        self.ewma_loss[class_id] += \
+            self.EWMA_ALPHA * (lost - self.ewma_loss[class_id])
 
-        index = 0
-        total_packets = len(packets)
+        if delay is not None:
+            self.ewma_delay[class_id] += \
+                self.EWMA_ALPHA * (delay - self.ewma_delay[class_id])
 
-        while index < total_packets or self.heap:
+        if self.current_time >= self.next_adapt_time:
+            self.adapt_weights()
 
-            while index < total_packets and \
-                  packets[index].arrival_time <= self.current_time:
+    # ------------------------------------------------------
 
-                self.add_packet(packets[index])
-                index += 1
+    def adapt_weights(self):
 
-            if self.heap:
-                _, packet = heapq.heappop(self.heap)
-                self.transmit(packet)
-            else:
-                if index < total_packets:
-                    self.current_time = packets[index].arrival_time
-                else:
-                    break
+        # Once per interval every weight decays toward its base; a
+        # class over its delay or loss target also gets a boost of up
+        # to WEIGHT_GAIN * base. Under persistent error this settles
+        # at base * (1 + WEIGHT_GAIN / WEIGHT_DECAY) instead of
+        # running up to MAX_WEIGHT.
+        targets = self.registry.delay_targets
+
+        # Classes are visited in priority order; a boosted class may
+        # not outrank any class above it.
+        ceiling = self.MAX_WEIGHT
+
+        for class_id, weight in enumerate(self.weights):
+
+            base = self.base_weights[class_id]
+
+            weight += self.WEIGHT_DECAY * (base - weight)
+
+            if targets[class_id] is not None:
+
+                error = max(
+                    (self.ewma_delay[class_id] - targets[class_id]) /
+                    targets[class_id],
+                    (self.ewma_loss[class_id] - self.LOSS_TARGET) /
+                    self.LOSS_TARGET
+                )
+
+                weight += self.WEIGHT_GAIN * base * max(0.0, min(error, 1.0))
+
+            weight = max(self.MIN_WEIGHT, min(weight, max(base, ceiling)))
+
+            self.weights[class_id] = weight
+            ceiling = min(ceiling, weight)
+
+        self.next_adapt_time = self.current_time + self.ADAPT_INTERVAL
+
+    # ------------------------------------------------------
+
+    def backlog(self):
+        return len(self.heap)
 
 
 # ==========================================================
 # PROPORTIONAL FAIR SCHEDULER
 # ==========================================================
 
-class PFScheduler:
+class PFScheduler(Scheduler):
 
     ALPHA = 0.9
 
-    def __init__(self, buffer_size=150):
+    def __init__(self, buffer_size=150, registry=None):
 
         self.buffer_size = buffer_size
 
-        self.voice_queue = []
-        self.video_queue = []
-        self.data_queue = []
+        self.registry = registry or get_registry()
+
+        self.queues = [[] for _ in range(len(self.registry))]
+        self.queue_length = 0
 
         self.current_time = 0
 
         self.transmitted_packets = []
         self.dropped_packets = []
 
-        self.avg_throughput = {
-            "voice": 1e-6,
-            "video": 1e-6,
-            "data": 1e-6
-        }
+        self.avg_throughput = [1e-6] * len(self.registry)
 
         self.queue_history = []
         self.time_history = []
@@ -274,52 +488,37 @@ class PFScheduler:
 
     def add_packet(self, packet):
 
-        total_queue_size = (
-            len(self.voice_queue) +
-            len(self.video_queue) +
-            len(self.data_queue)
-        )
-
-        if total_queue_size >= self.buffer_size:
+        if self.queue_length >= self.buffer_size:
             self.dropped_packets.append(packet)
             return
 
-        if packet.traffic_type == "voice":
-            self.voice_queue.append(packet)
-        elif packet.traffic_type == "video":
-            self.video_queue.append(packet)
-        else:
-            self.data_queue.append(packet)
+        self.queues[packet.class_id].append(packet)
+        self.queue_length += 1
 
     # ------------------------------------------------------
 
     def select_packet(self):
 
-        candidates = []
+        selected = None
+        best_metric = 0
+
+        for class_id, queue in enumerate(self.queues):
 
-        if self.voice_queue:
-            metric = LINK_BANDWIDTH / self.avg_throughput["voice"]
-            candidates.append(("voice", metric))
+            if not queue:
+                continue
 
-        if self.video_queue:
-            metric = LINK_BANDWIDTH / self.avg_throughput["video"]
-            candidates.append(("video", metric))
+            metric = LINK_BANDWIDTH / self.avg_throughput[class_id]
 
-        if self.data_queue:
-            metric = LINK_BANDWIDTH / self.avg_throughput["data"]
-            candidates.append(("data", metric))
+            if selected is None or metric > best_metric:
+                selected = queue
+                best_metric = metric
 
-        if not candidates:
+        if selected is None:
             return None
 
-        selected_class = max(candidates, key=lambda x: x[1])[0]
+        self.queue_length -= 1
 
-        if selected_class == "voice":
-            return self.voice_queue.pop(0)
-        elif selected_class == "video":
-            return self.video_queue.pop(0)
-        else:
-            return self.data_queue.pop(0)
+        return selected.pop(0)
 
     # ------------------------------------------------------
 
@@ -329,7 +528,7 @@ class PFScheduler:
 
         if waiting_time > packet.deadline:
             self.dropped_packets.append(packet)
-            return
+            return False
 
         packet.start_time = self.current_time
 
@@ -342,46 +541,19 @@ class PFScheduler:
 
         achieved_rate = packet.size / tx_time
 
-        old_avg = self.avg_throughput[packet.traffic_type]
+        old_avg = self.avg_throughput[packet.class_id]
 
-        self.avg_throughput[packet.traffic_type] = (
+        self.avg_throughput[packet.class_id] = (
             self.ALPHA * old_avg +
             (1 - self.ALPHA) * achieved_rate
         )
 
-        total_q = (
-            len(self.voice_queue) +
-            len(self.video_queue) +
-            len(self.data_queue)
-        )
-
-        self.queue_history.append(total_q)
+        self.queue_history.append(self.queue_length)
         self.time_history.append(self.current_time)
 
-    # ------------------------------------------------------
-
-    def run(self, packets):
-
-        packets.sort(key=lambda p: p.arrival_time)
-
-        index = 0
-        total_packets = len(packets)
-
-        while index < total_packets or \
-              self.voice_queue or self.video_queue or self.data_queue:
-
-            while index < total_packets and \
-                  packets[index].arrival_time <= self.current_time:
+        return True
 
-                self.add_packet(packets[index])
-                index += 1
-
-            packet = self.select_packet()
+    # ------------------------------------------------------
 
-            if packet:
-                self.transmit(packet)
-            else:
-                if index < total_packets:
-                    self.current_time = packets[index].arrival_time
-                else:
-                    break
+    def backlog(self):
+        return self.queue_length
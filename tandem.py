@@ -0,0 +1,154 @@
+# tandem.py
+#
+# Multi-hop (tandem) simulation: the departures of one scheduler
+# stream directly into the next as arrivals. Hops are chained
+# generators, so a packet leaving hop k is offered to hop k+1 as
+# soon as hop k+1 needs its next arrival; no hop's output is
+# collected into a list first.
+
+import copy
+
+from metrics import calculate_metrics
+from traffic_classes import get_registry
+
+
+class TandemNetwork:
+
+    DEADLINE_MODES = ("end_to_end", "per_hop")
+
+    def __init__(self, hops, deadline_mode="end_to_end", registry=None):
+        """
+        hops: scheduler instances, in path order
+        deadline_mode: "end_to_end" gives each hop only the
+            remaining budget of the class deadline; "per_hop" applies
+            the full class deadline at every hop.
+        """
+
+        if not hops:
+            raise ValueError("A tandem needs at least one hop")
+
+        if deadline_mode not in self.DEADLINE_MODES:
+            raise ValueError(f"Unknown deadline mode: {deadline_mode}")
+
+        self.hops = list(hops)
+        self.deadline_mode = deadline_mode
+        self.registry = registry or get_registry()
+
+        self.offered = [0] * len(self.registry)
+        self.delivered_packets = []
+
+    # ------------------------------------------------------
+
+    def _enter(self, packets):
+
+        for packet in packets:
+
+            packet.origin_time = packet.arrival_time
+            packet.origin_deadline = packet.deadline
+            packet.hop_delays = []
+
+            self.offered[packet.class_id] += 1
+
+            yield packet
+
+    def _handoff(self, departures):
+
+        # Each hop keeps its own copy, so per-hop records in the
+        # upstream scheduler are not overwritten downstream.
+        for packet in departures:
+
+            hop_delays = packet.hop_delays + \
+                [packet.end_time - packet.arrival_time]
+
+            arrival = copy.copy(packet)
+
+            arrival.arrival_time = packet.end_time
+            arrival.start_time = None
+            arrival.end_time = None
+            arrival.finish_time = 0
+            arrival.hop_delays = hop_delays
+
+            if self.deadline_mode == "end_to_end":
+                arrival.deadline = packet.origin_deadline - \
+                    (arrival.arrival_time - packet.origin_time)
+
+            yield arrival
+
+    # ------------------------------------------------------
+
+    def departures(self, packets):
+        """
+        Generator of packets leaving the last hop, in order.
+        """
+
+        stream = self._enter(sorted(packets, key=lambda p: p.arrival_time))
+
+        for position, hop in enumerate(self.hops):
+
+            if position:
+                stream = self._handoff(stream)
+
+            stream = hop.stream(stream)
+
+        return stream
+
+    def run(self, packets):
+
+        for packet in self.departures(packets):
+            packet.hop_delays = packet.hop_delays + \
+                [packet.end_time - packet.arrival_time]
+            self.delivered_packets.append(packet)
+
+    # ------------------------------------------------------
+
+    def hop_metrics(self, simulation_time):
+        """
+        calculate_metrics for every hop, in path order.
+        """
+
+        return [
+            calculate_metrics(
+                hop.transmitted_packets,
+                hop.dropped_packets,
+                simulation_time,
+                self.registry
+            )
+            for hop in self.hops
+        ]
+
+    def end_to_end_metrics(self):
+
+        registry = self.registry
+
+        delays = [[] for _ in range(len(registry))]
+        on_time = [0] * len(registry)
+
+        for p in self.delivered_packets:
+
+            delay = p.end_time - p.origin_time
+
+            delays[p.class_id].append(delay)
+
+            if delay <= p.origin_deadline:
+                on_time[p.class_id] += 1
+
+        results = {}
+
+        for class_id, traffic_type in enumerate(registry.names):
+
+            class_delays = delays[class_id]
+            offered = self.offered[class_id]
+            delivered = len(class_delays)
+
+            results[traffic_type] = {
+                "average_delay":
+                    sum(class_delays) / delivered if delivered else 0,
+                "delivered": delivered,
+                "lost": offered - delivered,
+                "loss_ratio":
+                    (offered - delivered) / offered if offered else 0,
+                "deadline_met_ratio":
+                    on_time[class_id] / offered if offered else 0
+            }
+
+        return results
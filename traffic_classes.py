@@ -0,0 +1,92 @@
+# traffic_classes.py
+#
+# Registry of traffic classes. Every module looks classes up by
+# integer id (index into the registry tables), so per-packet
+# dispatch is a list index rather than a chain of string compares.
+# Lower ids are higher priority.
+
+
+class TrafficClass:
+
+    def __init__(self, name, weight, deadline, size_range, share,
+                 delay_target=None):
+        self.name = name
+        self.weight = weight              # WFQ base weight
+        self.deadline = deadline          # seconds
+        self.size_range = size_range      # (min, max) bytes, uniform
+        self.share = share                # fraction of arrivals
+        self.delay_target = delay_target  # WFQ adaptive target (sec)
+
+    def __repr__(self):
+        return f"TrafficClass(name={self.name}, weight={self.weight})"
+
+
+class ClassRegistry:
+
+    def __init__(self, classes):
+
+        if not classes:
+            raise ValueError("Registry needs at least one traffic class")
+
+        self.classes = list(classes)
+
+        # Integer-indexed tables (class_id -> value)
+        self.names = [c.name for c in self.classes]
+        self.weights = [c.weight for c in self.classes]
+        self.deadlines = [c.deadline for c in self.classes]
+        self.size_ranges = [c.size_range for c in self.classes]
+        self.delay_targets = [c.delay_target for c in self.classes]
+
+        total_share = sum(c.share for c in self.classes)
+        self.shares = [c.share / total_share for c in self.classes]
+
+        self.ids = {name: class_id for class_id, name in enumerate(self.names)}
+
+        if len(self.ids) != len(self.names):
+            raise ValueError("Traffic class names must be unique")
+
+    def __len__(self):
+        return len(self.classes)
+
+    def class_id(self, traffic_type):
+        return self.ids[traffic_type]
+
+
+# ==========================================================
+# PRESETS
+# ==========================================================
+
+DEFAULT_CLASSES = ClassRegistry([
+    TrafficClass("voice", 5.0, 0.05, (500, 1000), 1, delay_target=0.04),
+    TrafficClass("video", 3.0, 0.15, (1000, 5000), 1, delay_target=0.12),
+    TrafficClass("data", 1.0, 1.0, (5000, 10000), 1),
+])
+
+# Eight DSCP-style classes (RFC 4594 service classes)
+DSCP_CLASSES = ClassRegistry([
+    TrafficClass("cs6", 6.0, 0.10, (100, 500), 0.02, delay_target=0.05),
+    TrafficClass("ef", 5.0, 0.05, (500, 1000), 0.18, delay_target=0.04),
+    TrafficClass("af41", 4.0, 0.15, (1000, 5000), 0.15, delay_target=0.12),
+    TrafficClass("af31", 3.0, 0.40, (1000, 8000), 0.15, delay_target=0.30),
+    TrafficClass("cs3", 3.0, 0.20, (100, 1000), 0.05),
+    TrafficClass("af21", 2.0, 0.50, (500, 5000), 0.15),
+    TrafficClass("af11", 1.0, 1.0, (5000, 10000), 0.15),
+    TrafficClass("default", 1.0, 2.0, (1000, 10000), 0.15),
+])
+
+
+_active = DEFAULT_CLASSES
+
+
+def get_registry():
+    return _active
+
+
+def set_registry(registry):
+    """
+    Select the registry used by packets, generators, schedulers
+    and metrics created from now on.
+    """
+
+    global _active
+    _active = registry
@@ -1,15 +1,24 @@
 # traffic_generator.py
 
 import random
+from itertools import accumulate
+
 from packet import Packet
+from traffic_classes import get_registry
 
 
-def generate_traffic(simulation_time, arrival_rate):
+def generate_traffic(simulation_time, arrival_rate, registry=None):
     """
     simulation_time: total simulation duration (seconds)
     arrival_rate: average packets per second
+    registry: traffic classes (default: the active registry)
     """
 
+    registry = registry or get_registry()
+
+    class_ids = range(len(registry))
+    cum_shares = list(accumulate(registry.shares))
+
     packets = []
     current_time = 0
     packet_id = 0
@@ -23,18 +32,18 @@ def generate_traffic(simulation_time, arrival_rate):
         if current_time > simulation_time:
             break
 
-        # Random traffic type
-        traffic_type = random.choice(["voice", "video", "data"])
+        # Random traffic class, drawn by arrival share
+        class_id = random.choices(class_ids, cum_weights=cum_shares)[0]
 
         # Packet sizes (bits)
-        if traffic_type == "voice":
-            size = random.randint(500, 1000) * 8
-        elif traffic_type == "video":
-            size = random.randint(1000, 5000) * 8
-        else:
-            size = random.randint(5000, 10000) * 8
-
-        packet = Packet(packet_id, current_time, size, traffic_type)
+        low, high = registry.size_ranges[class_id]
+        size = random.randint(low, high) * 8
+
+        # By class_id (no name lookup); positional, as keyword
+        # arguments make the constructor call measurably slower.
+        packet = Packet(
+            packet_id, current_time, size, None, registry, class_id
+        )
         packets.append(packet)
 
         packet_id += 1
@@ -0,0 +1,446 @@
+# traffic_models.py
+#
+# Vectorized traffic sources. Each class gets an arrival process
+# and a size model; generate_batch() draws every class in bulk with
+# numpy and merges them into one time-ordered batch that can be
+# streamed into the schedulers as Packet objects.
+
+import numpy as np
+
+from packet import Packet
+from traffic_classes import get_registry
+
+
+# ==========================================================
+# ARRIVAL PROCESSES
+# ==========================================================
+
+class PoissonArrivals:
+
+    def __init__(self, rate):
+        self.rate = rate  # packets per second
+
+    def times(self, rng, duration):
+
+        count = rng.poisson(self.rate * duration)
+
+        return np.sort(rng.uniform(0, duration, count))
+
+
+class CBRArrivals:
+    """
+    Periodic sources, e.g. voice codecs emitting one frame every
+    20 ms. Each flow starts at a random phase; optional Gaussian
+    jitter (sec) is added per packet.
+    """
+
+    def __init__(self, interval=0.02, flows=1, jitter=0.0):
+        self.interval = interval
+        self.flows = flows
+        self.jitter = jitter
+
+    def times(self, rng, duration):
+
+        phases = rng.uniform(0, self.interval, self.flows)
+        ticks = np.arange(0, duration, self.interval)
+
+        times = np.add.outer(phases, ticks).ravel()
+
+        if self.jitter:
+            times += rng.normal(0, self.jitter, times.size)
+
+        times = times[(times >= 0) & (times < duration)]
+
+        return np.sort(times)
+
+
+class OnOffParetoArrivals:
+    """
+    Superposition of on/off sources with Pareto distributed on and
+    off periods. Each source sends at peak_rate while on. With
+    1 < shape < 2 the aggregate is self-similar.
+    """
+
+    def __init__(self, peak_rate, mean_on, mean_off, sources=1, shape=1.5):
+        self.peak_rate = peak_rate
+        self.mean_on = mean_on
+        self.mean_off = mean_off
+        self.sources = sources
+        self.shape = shape
+
+    def _pareto(self, rng, mean, size):
+
+        # Classic Pareto with the given mean (numpy draws Lomax)
+        scale = mean * (self.shape - 1) / self.shape
+
+        return scale * (1 + rng.pareto(self.shape, size))
+
+    def times(self, rng, duration):
+
+        cycle = self.mean_on + self.mean_off
+        cycles = int(2 * duration / cycle) + 16
+
+        on = self._pareto(rng, self.mean_on, (self.sources, cycles))
+        off = self._pareto(rng, self.mean_off, (self.sources, cycles))
+
+        # Random initial offset so sources are not synchronised
+        offset = rng.uniform(0, cycle, (self.sources, 1))
+
+        starts = offset + np.cumsum(on + off, axis=1) - (on + off)
+
+        # Heavy tails can leave a source short of the horizon
+        while (starts[:, -1] + on[:, -1] < duration).any():
+            more_on = self._pareto(rng, self.mean_on, (self.sources, cycles))
+            more_off = self._pareto(rng, self.mean_off, (self.sources, cycles))
+            last = starts[:, -1:] + on[:, -1:] + off[:, -1:]
+            more_starts = last + np.cumsum(more_on + more_off, axis=1) \
+                - (more_on + more_off)
+            on = np.hstack([on, more_on])
+            off = np.hstack([off, more_off])
+            starts = np.hstack([starts, more_starts])
+
+        starts = starts.ravel()
+        on = on.ravel()
+
+        keep = starts < duration
+        starts = starts[keep]
+        on = np.minimum(on[keep], duration - starts)
+
+        # floor plus a Bernoulli on the fraction keeps the expected
+        # burst length at on * peak_rate (ceil adds half a packet)
+        mean_counts = on * self.peak_rate
+        counts = np.floor(mean_counts).astype(np.int64)
+        counts += rng.uniform(0, 1, counts.size) < mean_counts - counts
+
+        # Packet k of a burst leaves k / peak_rate after its start
+        first = np.cumsum(counts) - counts
+        index = np.arange(counts.sum()) - np.repeat(first, counts)
+
+        times = np.repeat(starts, counts) + index / self.peak_rate
+
+        return np.sort(times[times < duration])
+
+
+class MMPPArrivals:
+    """
+    Markov-modulated Poisson process. rates[i] is the arrival rate
+    in state i, generator[i][j] the transition rate from i to j.
+    """
+
+    def __init__(self, rates, generator):
+        self.rates = np.asarray(rates, dtype=float)
+        self.generator = np.asarray(generator, dtype=float)
+
+    def times(self, rng, duration):
+
+        states = len(self.rates)
+
+        exit_rates = self.generator.sum(axis=1) - np.diag(self.generator)
+        jump = self.generator / np.where(exit_rates, exit_rates, 1)[:, None]
+        np.fill_diagonal(jump, 0)
+
+        # Walk the modulating chain in chunks. Successors of every
+        # state and all sojourn times are drawn in bulk; the walk
+        # itself only indexes into the pre-drawn successors.
+        chunk = int(duration * exit_rates.max()) + 16
+
+        boundaries = [np.zeros(1)]
+        visited = []
+
+        state = int(rng.integers(states))
+        now = 0.0
+
+        while now < duration:
+
+            successors = [
+                rng.choice(states, chunk, p=jump[i]).tolist()
+                if exit_rates[i] > 0 else []
+                for i in range(states)
+            ]
+            used = [0] * states
+
+            path = []
+
+            for _ in range(chunk):
+                path.append(state)
+                if exit_rates[state] == 0:
+                    break
+                next_state = successors[state][used[state]]
+                used[state] += 1
+                state = next_state
+
+            path = np.asarray(path)
+
+            with np.errstate(divide="ignore"):
+                sojourns = rng.standard_exponential(path.size) / \
+                    exit_rates[path]
+
+            ends = now + np.cumsum(sojourns)
+
+            # Keep the states entered before the horizon
+            entered = np.concatenate([[now], ends[:-1]]) < duration
+            path = path[entered]
+            ends = np.minimum(ends[entered], duration)
+
+            visited.append(path)
+            boundaries.append(ends)
+
+            now = ends[-1]
+
+        boundaries = np.concatenate(boundaries)
+        visited = np.concatenate(visited)
+
+        lengths = np.diff(boundaries)
+        counts = rng.poisson(self.rates[visited] * lengths)
+
+        starts = np.repeat(boundaries[:-1], counts)
+        spans = np.repeat(lengths, counts)
+
+        return np.sort(starts + rng.uniform(0, 1, counts.sum()) * spans)
+
+
+# ==========================================================
+# SIZE MODELS (return bits)
+# ==========================================================
+
+class UniformSize:
+
+    def __init__(self, low, high):
+        self.low = low    # bytes
+        self.high = high  # bytes
+
+    def sample(self, rng, count):
+        return rng.integers(self.low, self.high + 1, count) * 8
+
+
+class FixedSize:
+
+    def __init__(self, size):
+        self.size = size  # bytes
+
+    def sample(self, rng, count):
+        return np.full(count, self.size * 8, dtype=np.int64)
+
+
+class ParetoSize:
+    """
+    Heavy-tailed sizes (e.g. video frames) with the given mean,
+    truncated at max_size bytes.
+    """
+
+    def __init__(self, mean, shape=1.8, max_size=64000):
+        self.mean = mean
+        self.shape = shape
+        self.max_size = max_size
+
+    def sample(self, rng, count):
+
+        scale = self.mean * (self.shape - 1) / self.shape
+        sizes = scale * (1 + rng.pareto(self.shape, count))
+
+        return np.minimum(sizes, self.max_size).astype(np.int64) * 8
+
+
+# ==========================================================
+# COMPOSITION
+# ==========================================================
+
+class ClassSource:
+
+    def __init__(self, arrivals, sizes):
+        self.arrivals = arrivals
+        self.sizes = sizes
+
+
+class TrafficBatch:
+    """
+    Time-ordered packets as parallel arrays.
+    """
+
+    CHUNK = 65536
+
+    def __init__(self, times, sizes, class_ids, registry):
+        self.times = times
+        self.sizes = sizes
+        self.class_ids = class_ids
+        self.registry = registry
+
+    def __len__(self):
+        return len(self.times)
+
+    def packets(self):
+        """
+        Lazily yield Packet objects in arrival order.
+        """
+
+        registry = self.registry
+
+        packet_id = 0
+
+        # Convert in chunks so large batches are never fully
+        # materialised as Python objects.
+        for start in range(0, len(self), self.CHUNK):
+
+            stop = start + self.CHUNK
+
+            for time, size, class_id in zip(
+                    self.times[start:stop].tolist(),
+                    self.sizes[start:stop].tolist(),
+                    self.class_ids[start:stop].tolist()):
+                # Positional: keyword arguments cost more per call
+                # than the name lookup that class_id avoids.
+                yield Packet(
+                    packet_id, time, size, None, registry, class_id
+                )
+                packet_id += 1
+
+    def to_packets(self):
+        return list(self.packets())
+
+
+def generate_batch(simulation_time, sources, rng=None, registry=None):
+    """
+    simulation_time: total simulation duration (seconds)
+    sources: {class name: ClassSource}
+    rng: numpy Generator (or seed)
+    """
+
+    registry = registry or get_registry()
+    rng = np.random.default_rng(rng)
+
+    times = []
+    sizes = []
+    class_ids = []
+
+    unknown = [name for name in sources if name not in registry.ids]
+
+    if unknown:
+        raise ValueError(
+            f"Sources {unknown} are not classes of the registry "
+            f"{registry.names}"
+        )
+
+    for traffic_type, source in sources.items():
+
+        class_times = source.arrivals.times(rng, simulation_time)
+
+        times.append(class_times)
+        sizes.append(source.sizes.sample(rng, class_times.size))
+        class_ids.append(np.full(
+            class_times.size, registry.class_id(traffic_type), dtype=np.int16
+        ))
+
+    times = np.concatenate(times)
+
+    # Each class is already sorted, so a stable (merge) sort only
+    # has to merge a handful of runs.
+    order = np.argsort(times, kind="stable")
+
+    return TrafficBatch(
+        times[order],
+        np.concatenate(sizes)[order],
+        np.concatenate(class_ids)[order],
+        registry
+    )
+
+
+# ==========================================================
+# PRESETS
+# ==========================================================
+
+def poisson_sources(arrival_rate, registry=None):
+    """
+    Same model as generate_traffic: Poisson arrivals split by
+    class share, uniform sizes from the registry.
+    """
+
+    registry = registry or get_registry()
+
+    return {
+        name: ClassSource(
+            PoissonArrivals(arrival_rate * share),
+            UniformSize(*size_range)
+        )
+        for name, share, size_range in zip(
+            registry.names, registry.shares, registry.size_ranges
+        )
+    }
+
+
+# Arrival model per class name for bursty_sources(): periodic codec
+# flows, self-similar on/off video, two-state MMPP for bulk data.
+BURSTY_MODELS = {
+    "voice": "cbr", "cs6": "cbr", "ef": "cbr", "cs3": "cbr",
+    "video": "onoff", "af41": "onoff", "af31": "onoff",
+    "data": "mmpp", "af21": "mmpp", "af11": "mmpp", "default": "mmpp",
+}
+
+
+def _bursty_source(model, rate, size_range):
+
+    low, high = size_range
+    mean_size = (low + high) / 2
+
+    if rate == 0:
+        return ClassSource(PoissonArrivals(0), UniformSize(low, high))
+
+    if model == "cbr":
+        # Whole 20 ms flows, with the interval stretched to hit rate
+        flows = max(1, round(rate * 0.02))
+
+        return ClassSource(
+            CBRArrivals(interval=flows / rate, flows=flows, jitter=0.001),
+            FixedSize(round(mean_size))
+        )
+
+    if model == "onoff":
+        # on/off duty cycle 1/3, so peak is 3x the mean per source
+        return ClassSource(
+            OnOffParetoArrivals(
+                peak_rate=rate * 3 / 4, mean_on=0.1, mean_off=0.2,
+                sources=4
+            ),
+            ParetoSize(mean=mean_size)
+        )
+
+    # Two states, quiet and busy, averaging rate
+    return ClassSource(
+        MMPPArrivals(
+            rates=[rate * 0.4, rate * 1.6],
+            generator=[[0, 2.0], [2.0, 0]]
+        ),
+        UniformSize(low, high)
+    )
+
+
+def bursty_sources(arrival_rate, registry=None):
+    """
+    Bursty sources for every class of the registry: CBR flows (20 ms
+    frames once there is at least one flow's worth of traffic),
+    self-similar on/off with heavy-tailed sizes, or MMPP, picked by
+    class name from BURSTY_MODELS. Mean rates follow the class
+    shares and mean sizes the registry size ranges, as in
+    poisson_sources().
+    """
+
+    registry = registry or get_registry()
+
+    if arrival_rate < 0:
+        raise ValueError(f"arrival_rate must be >= 0, got {arrival_rate}")
+
+    unknown = [name for name in registry.names if name not in BURSTY_MODELS]
+
+    if unknown:
+        raise ValueError(
+            f"No bursty model for classes {unknown}; add them to "
+            "traffic_models.BURSTY_MODELS"
+        )
+
+    return {
+        name: _bursty_source(
+            BURSTY_MODELS[name], arrival_rate * share, size_range
+        )
+        for name, share, size_range in zip(
+            registry.names, registry.shares, registry.size_ranges
+        )
+    }